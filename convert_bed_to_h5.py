@@ -113,8 +113,8 @@ class BedToH5Converter:
         if self.chunk_size is not None:
             return min(self.chunk_size, n_samples)
         
-        # Estimate memory per sample (4 bytes per genotype * number of variants)
-        bytes_per_sample = n_variants * 4  # float32
+        # Estimate memory per sample (1 byte per genotype * number of variants)
+        bytes_per_sample = n_variants  # int8
         
         # Target memory usage in bytes
         target_memory_bytes = self.memory_usage * 1024**3  # Convert GB to bytes
@@ -150,8 +150,8 @@ class BedToH5Converter:
             Tuple of (needs_chunking, required_memory_gb, available_memory_gb)
         """
         # Calculate memory required to load full dataset
-        # Each genotype is float32 (4 bytes)
-        required_memory_bytes = n_samples * n_variants * 4
+        # Each genotype is int8 (1 byte)
+        required_memory_bytes = n_samples * n_variants
         required_memory_gb = required_memory_bytes / (1024**3)
         
         # Check if we're running under SLURM and get allocated memory
@@ -287,29 +287,36 @@ class BedToH5Converter:
         """
         bed_files = []
         
-        for bed_file in self.input_dir.rglob("*.bed"):
-            # Skip temporary files
-            if "temporary" in bed_file.name.lower():
-                self.logger.info(f"Skipping temporary file: {bed_file}")
-                continue
-            
-            # Get the prefix (filename without .bed extension)
-            prefix = bed_file.stem
-            
-            # Check if corresponding .bim and .fam files exist
-            bim_file = bed_file.with_suffix('.bim')
-            fam_file = bed_file.with_suffix('.fam')
-            
-            if not bim_file.exists():
-                self.logger.warning(f"Missing .bim file for {bed_file}, skipping")
-                continue
-            
-            if not fam_file.exists():
-                self.logger.warning(f"Missing .fam file for {bed_file}, skipping")
-                continue
-            
-            bed_files.append((bed_file, prefix))
-            self.logger.info(f"Found complete PLINK fileset: {bed_file.parent / prefix}")
+        # One directory listing per folder instead of a stat per .bim/.fam
+        for dirpath, _, filenames in os.walk(self.input_dir):
+            present = {}
+            for name in filenames:
+                stem, _, ext = name.rpartition('.')
+                if stem and ext in ('bed', 'bim', 'fam'):
+                    present.setdefault(stem, set()).add(ext)
+            
+            for prefix in sorted(present):
+                extensions = present[prefix]
+                if 'bed' not in extensions:
+                    continue
+                bed_file = Path(dirpath) / f"{prefix}.bed"
+                
+                # Skip temporary files
+                if "temporary" in bed_file.name.lower():
+                    self.logger.info(f"Skipping temporary file: {bed_file}")
+                    continue
+                
+                # Check if corresponding .bim and .fam files exist
+                if 'bim' not in extensions:
+                    self.logger.warning(f"Missing .bim file for {bed_file}, skipping")
+                    continue
+                
+                if 'fam' not in extensions:
+                    self.logger.warning(f"Missing .fam file for {bed_file}, skipping")
+                    continue
+                
+                bed_files.append((bed_file, prefix))
+                self.logger.info(f"Found complete PLINK fileset: {bed_file.parent / prefix}")
         
         return bed_files
     
@@ -332,7 +339,8 @@ class BedToH5Converter:
             bed_reader = Bed(plink_prefix)
             
             # Read all data
-            snp_data = bed_reader.read()
+            # Allele counts 0/1/2 fit in int8; missing genotypes become -127
+            snp_data = bed_reader.read(dtype='int8')
             genotype_matrix = snp_data.val  # Get the genotype matrix
             
             # Get sample and variant information
@@ -351,7 +359,7 @@ class BedToH5Converter:
             with h5py.File(h5_file_path, 'w') as h5f:
                 # Save genotype data
                 h5f.create_dataset('genotype_data', data=genotype_matrix,
-                                    dtype='float32',
+                                    dtype='int8',
                                     compression='gzip')
             
             self.logger.info(f"Successfully converted to {h5_file_path}")
@@ -404,7 +412,7 @@ class BedToH5Converter:
                 self.logger.info(f"Initializing HDF5 dataset with shape ({n_samples}, {n_variants})")
                 dset = h5f.create_dataset('genotype_data',
                                         shape=(n_samples, n_variants),
-                                        dtype='float32',
+                                        dtype='int8',
                                         compression='gzip',
                                         chunks=True)
                 
@@ -416,7 +424,7 @@ class BedToH5Converter:
                     end_idx = min(i + chunk_size, n_samples)
                     
                     # Read chunk of data using pysnptools slicing
-                    chunk_data = bed_reader[i:end_idx, :].read().val
+                    chunk_data = bed_reader[i:end_idx, :].read(dtype='int8').val
                     
                     # Write chunk data to the dataset
                     dset[i:end_idx, :] = chunk_data
@@ -2,34 +2,44 @@
 Gensim: A Python package for generating simulated genomic data using GCTA.
 """
 
+import importlib
+import importlib.util
+
 __version__ = "0.1.0"
 __author__ = "Dennis Gankin"
 
-from .simulator import GCTASimulator
-from .config import SimulationConfig
-from .utils import GCTAUtils
-from .plink_simulator import (
-    PLINKSimulator, 
-    PLINKSimulationConfig, 
-    PLINKSimulationSet,
-    PLINKParameterGrid,
-    PLINKParameterGridSimulator
-)
-
-# Import HDF5 utilities if h5py is available
-try:
-    from .h5_utils import H5PLINKReader, read_h5_plink, list_h5_files
-    HDF5_AVAILABLE = True
-    __all__ = [
-        "GCTASimulator", "SimulationConfig", "GCTAUtils", 
-        "PLINKSimulator", "PLINKSimulationConfig", "PLINKSimulationSet",
-        "PLINKParameterGrid", "PLINKParameterGridSimulator",
-        "H5PLINKReader", "read_h5_plink", "list_h5_files"
-    ]
-except ImportError:
-    HDF5_AVAILABLE = False
-    __all__ = [
-        "GCTASimulator", "SimulationConfig", "GCTAUtils", 
-        "PLINKSimulator", "PLINKSimulationConfig", "PLINKSimulationSet",
-        "PLINKParameterGrid", "PLINKParameterGridSimulator"
-    ]
+# Public names and the submodules defining them. Submodules (and their
+# pandas/numpy imports) are loaded on first access (PEP 562), so
+# `from gensim import PLINKParameterGrid` does not import the GCTA simulator.
+_LAZY_IMPORTS = {
+    "GCTASimulator": ".simulator",
+    "SimulationConfig": ".config",
+    "GCTAUtils": ".utils",
+    "PLINKSimulator": ".plink_simulator",
+    "PLINKSimulationConfig": ".plink_simulator",
+    "PLINKSimulationSet": ".plink_simulator",
+    "PLINKParameterGrid": ".plink_simulator",
+    "PLINKParameterGridSimulator": ".plink_simulator",
+    "H5PLINKReader": ".h5_utils",
+    "read_h5_plink": ".h5_utils",
+    "list_h5_files": ".h5_utils",
+}
+
+# HDF5 utilities need h5py; check for it without importing it
+HDF5_AVAILABLE = importlib.util.find_spec("h5py") is not None
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -82,6 +82,16 @@ class SimulationConfig:
             for combo in combinations
         ]
     
+    def get_num_combinations(self) -> int:
+        """Number of parameter combinations, without building the grid."""
+        axes = [self.cohort_sizes, self.num_causal_snps, self.heritabilities]
+        if self.trait_type == "binary":
+            axes.append(self.prevalences)
+        count = 1
+        for axis in axes:
+            count *= len(axis)
+        return count
+    
     def get_simulation_name(self, cohort_size: int, num_causal: int, 
                           heritability: float, prevalence: Optional[float] = None,
                           rep: int = 1) -> str:
@@ -5,10 +5,14 @@ PLINK simulation functionality for generating synthetic SNP datasets.
 import os
 import subprocess
 import logging
-from typing import List, Dict, Optional, Tuple, Any, Union
-from dataclasses import dataclass, field
+import functools
+from typing import List, Dict, Optional, Sequence, Tuple, Any, Union, Iterator
+from dataclasses import InitVar, dataclass, field, fields
 from pathlib import Path
-from itertools import product
+from itertools import product, count
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 from .utils import GCTAUtils
 
@@ -17,11 +21,11 @@ from .utils import GCTAUtils
 class PLINKParameterGrid:
     """Configuration for parameter grid generation."""
     
-    # Grid parameters - can be single values or lists
-    cohort_sizes: Union[int, List[int]] = field(default_factory=lambda: [1000])  # total individuals (cases + controls)
-    prevalences: Union[float, List[float]] = field(default_factory=lambda: [0.01])
-    total_snps: Union[int, List[int]] = field(default_factory=lambda: [10000])
-    causal_snps: Union[int, List[int]] = field(default_factory=lambda: [100])
+    # Grid parameters - single values or sequences, stored as tuples
+    cohort_sizes: Union[int, Sequence[int]] = field(default_factory=lambda: (1000,))  # total individuals (cases + controls)
+    prevalences: Union[float, Sequence[float]] = field(default_factory=lambda: (0.01,))
+    total_snps: Union[int, Sequence[int]] = field(default_factory=lambda: (10000,))
+    causal_snps: Union[int, Sequence[int]] = field(default_factory=lambda: (100,))
     
     # Grid output configuration
     grid_output_dir: str = "parameter_grid"
@@ -35,80 +39,252 @@ class PLINKParameterGrid:
     hom_odds_ratio: Union[float, str] = "mult"
     plink_executable: str = "plink"
     random_seed: Optional[int] = None
+    # Create grid_output_dir on construction; not part of the saved config
+    create_output_dir: InitVar[bool] = True
     
-    def __post_init__(self):
+    # Cached parameter combinations, rebuilt when a grid axis is reassigned.
+    # The axes are stored as tuples so they cannot change under the cache.
+    _combinations_cache: Optional[List[Dict[str, Any]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Derived per-axis columns (cases, controls, null SNPs) and per-combination
+    # seeds, same lifetime
+    _derived: Optional[Dict[str, List]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    # Fields that determine the parameter combinations and their seeds
+    _COMBINATION_FIELDS = frozenset({
+        'cohort_sizes', 'prevalences', 'total_snps', 'causal_snps',
+        'case_control_ratio', 'random_seed'
+    })
+    
+    # Grid axes, stored as tuples
+    _AXIS_FIELDS = ('cohort_sizes', 'prevalences', 'total_snps', 'causal_snps')
+    
+    def __setattr__(self, name: str, value: Any):
+        """Freeze grid axes and invalidate cached combinations on reassignment."""
+        if name in self._AXIS_FIELDS and isinstance(value, (list, tuple, range, np.ndarray)):
+            value = tuple(value.tolist() if isinstance(value, np.ndarray) else value)
+        super().__setattr__(name, value)
+        if name in self._COMBINATION_FIELDS:
+            super().__setattr__('_combinations_cache', None)
+            super().__setattr__('_derived', None)
+    
+    def __post_init__(self, create_output_dir: bool):
         """Validate and normalize grid parameters."""
-        # Convert single values to lists for consistency
+        # Convert single values to tuples for consistency
         if isinstance(self.cohort_sizes, int):
-            self.cohort_sizes = [self.cohort_sizes]
+            self.cohort_sizes = (self.cohort_sizes,)
         if isinstance(self.prevalences, float):
-            self.prevalences = [self.prevalences]
+            self.prevalences = (self.prevalences,)
         if isinstance(self.total_snps, int):
-            self.total_snps = [self.total_snps]
+            self.total_snps = (self.total_snps,)
         if isinstance(self.causal_snps, int):
-            self.causal_snps = [self.causal_snps]
-        
-        # Validate parameters
-        for cohort_size in self.cohort_sizes:
-            if cohort_size < 10:
-                raise ValueError(f"Cohort size must be at least 10, got {cohort_size}")
-        
-        for prevalence in self.prevalences:
-            if not 0 < prevalence < 1:
-                raise ValueError(f"Prevalence must be between 0 and 1, got {prevalence}")
-        
-        for total_snp in self.total_snps:
-            if total_snp < 1:
-                raise ValueError(f"Total SNPs must be positive, got {total_snp}")
-        
-        for causal_snp in self.causal_snps:
-            if causal_snp < 0:
-                raise ValueError(f"Causal SNPs cannot be negative, got {causal_snp}")
+            self.causal_snps = (self.causal_snps,)
+        
+        # Validate parameters in one vectorized pass per axis, collecting
+        # every offending value instead of stopping at the first one
+        cohort_arr = np.asarray(self.cohort_sizes)
+        prev_arr = np.asarray(self.prevalences, dtype=float)
+        total_arr = np.asarray(self.total_snps)
+        causal_arr = np.asarray(self.causal_snps)
+        
+        errors = []
+        bad = cohort_arr[cohort_arr < 10]
+        if bad.size:
+            errors.append(f"Cohort size must be at least 10, got {bad.tolist()}")
+        bad = prev_arr[~((prev_arr > 0) & (prev_arr < 1))]
+        if bad.size:
+            errors.append(f"Prevalence must be between 0 and 1, got {bad.tolist()}")
+        bad = total_arr[total_arr < 1]
+        if bad.size:
+            errors.append(f"Total SNPs must be positive, got {bad.tolist()}")
+        bad = causal_arr[causal_arr < 0]
+        if bad.size:
+            errors.append(f"Causal SNPs cannot be negative, got {bad.tolist()}")
         
         # Check that causal SNPs don't exceed total SNPs for any combination
-        max_causal = max(self.causal_snps)
-        min_total = min(self.total_snps)
+        max_causal = int(causal_arr.max())
+        min_total = int(total_arr.min())
         if max_causal > min_total:
-            raise ValueError(f"Maximum causal SNPs ({max_causal}) exceeds minimum total SNPs ({min_total})")
+            errors.append(f"Maximum causal SNPs ({max_causal}) exceeds minimum total SNPs ({min_total})")
+        
+        if errors:
+            raise ValueError("; ".join(errors))
         
         if not 0 < self.case_control_ratio <= 10:
             raise ValueError(f"Case-control ratio must be between 0 and 10, got {self.case_control_ratio}")
         
         # Create output directory
-        os.makedirs(self.grid_output_dir, exist_ok=True)
+        if create_output_dir:
+            os.makedirs(self.grid_output_dir, exist_ok=True)
+    
+    def __len__(self) -> int:
+        """Number of parameter combinations in the grid."""
+        return (len(self.cohort_sizes) * len(self.prevalences) *
+                len(self.total_snps) * len(self.causal_snps))
+    
+    def _get_derived(self) -> Dict[str, List]:
+        """
+        Compute derived columns for all axis values with numpy broadcasting.
+        
+        Cases and controls depend only on the cohort size and null SNPs only
+        on the (total, causal) pair, so they are computed per axis rather than
+        per combination.
+        """
+        if self._derived is None:
+            cohort = np.asarray(self.cohort_sizes, dtype=np.int64)
+            # Calculate cases and controls based on cohort size and ratio,
+            # ensuring at least 1 case
+            cases = np.maximum((cohort / (1 + self.case_control_ratio)).astype(np.int64), 1)
+            null_snps = (np.asarray(self.total_snps, dtype=np.int64)[:, None] -
+                         np.asarray(self.causal_snps, dtype=np.int64)[None, :])
+            
+            # Draw one seed per combination from the base seed in a single call
+            seeds = None
+            if self.random_seed is not None:
+                rng = np.random.default_rng(self.random_seed)
+                seeds = rng.integers(0, 2**31 - 1, size=len(self), dtype=np.int64).tolist()
+            
+            # Convert back to Python ints so combinations stay JSON-serializable
+            self._derived = {
+                'num_cases': cases.tolist(),
+                'num_controls': (cohort - cases).tolist(),
+                'null_snps': null_snps.tolist(),
+                'seeds': seeds
+            }
+        return self._derived
+    
+    def get_combination_seed(self, index: int) -> Optional[int]:
+        """
+        Get the random seed for the combination at the given index.
+        
+        Seeds are derived reproducibly from random_seed so that combinations
+        get independent random streams.
+        
+        Args:
+            index: Combination index
+            
+        Returns:
+            Seed for this combination, or None if no random_seed is set
+        """
+        seeds = self._get_derived()['seeds']
+        return None if seeds is None else seeds[index]
+    
+    def _build_combination(self, cohort_idx: int, prevalence_idx: int,
+                           total_idx: int, causal_idx: int) -> Dict[str, Any]:
+        """Build the combination dictionary for one set of axis positions."""
+        derived = self._get_derived()
+        return {
+            'cohort_size': self.cohort_sizes[cohort_idx],
+            'num_cases': derived['num_cases'][cohort_idx],
+            'num_controls': derived['num_controls'][cohort_idx],
+            'prevalence': self.prevalences[prevalence_idx],
+            'total_snps': self.total_snps[total_idx],
+            'causal_snps': self.causal_snps[causal_idx],
+            'null_snps': derived['null_snps'][total_idx][causal_idx]
+        }
+    
+    def get_combination(self, index: int) -> Dict[str, Any]:
+        """
+        Get a single parameter combination by its position in the grid.
+        
+        The index is decoded into per-axis positions, so no other combinations
+        are built. Ordering matches get_parameter_combinations().
+        
+        Args:
+            index: Combination index (negative values count from the end)
+            
+        Returns:
+            Parameter combination dictionary
+        """
+        total = len(self)
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError(f"Combination index out of range for grid of size {total}")
+        
+        # The last axis varies fastest, matching itertools.product
+        index, causal_idx = divmod(index, len(self.causal_snps))
+        index, total_idx = divmod(index, len(self.total_snps))
+        cohort_idx, prevalence_idx = divmod(index, len(self.prevalences))
+        
+        return self._build_combination(cohort_idx, prevalence_idx, total_idx, causal_idx)
+    
+    def iter_parameter_combinations(self) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield parameter combinations without building the full list.
+        
+        Yields:
+            Parameter combination dictionaries in grid order
+        """
+        if self._combinations_cache is not None:
+            yield from self._combinations_cache
+            return
+        
+        for indices in product(range(len(self.cohort_sizes)), range(len(self.prevalences)),
+                               range(len(self.total_snps)), range(len(self.causal_snps))):
+            yield self._build_combination(*indices)
     
     def get_parameter_combinations(self) -> List[Dict[str, Any]]:
         """
         Generate all parameter combinations from the grid.
         
+        The combinations are computed once and cached; reassigning any grid
+        parameter clears the cache. The grid axes are tuples, so they cannot
+        be changed in place.
+        
         Returns:
             List of dictionaries, each containing one parameter combination
         """
-        combinations = []
-        
-        for cohort_size, prevalence, total_snp, causal_snp in product(
-            self.cohort_sizes, self.prevalences, self.total_snps, self.causal_snps
-        ):
-            # Calculate cases and controls based on cohort size and ratio
-            total_cases = int(cohort_size / (1 + self.case_control_ratio))
-            total_controls = cohort_size - total_cases
-            
-            # Ensure at least 1 case and 1 control
-            if total_cases == 0:
-                total_cases = 1
-                total_controls = cohort_size - 1
-            
-            combinations.append({
-                'cohort_size': cohort_size,
-                'num_cases': total_cases,
-                'num_controls': total_controls,
-                'prevalence': prevalence,
-                'total_snps': total_snp,
-                'causal_snps': causal_snp,
-                'null_snps': total_snp - causal_snp
-            })
-        
-        return combinations
+        if self._combinations_cache is None:
+            self._combinations_cache = list(self.iter_parameter_combinations())
+        return self._combinations_cache
+
+    @property
+    def parameter_combinations(self) -> List[Dict[str, Any]]:
+        """Cached list of all parameter combinations (see get_parameter_combinations)."""
+        return self.get_parameter_combinations()
+
+    def get_combinations_dataframe(self):
+        """
+        Build a table of all parameter combinations.
+        
+        Columns are computed directly from the axis arrays, one row per
+        combination in grid order (the row index is the combination index).
+        
+        Returns:
+            pandas DataFrame with one column per combination field
+        """
+        import pandas as pd
+        
+        shape = (len(self.cohort_sizes), len(self.prevalences),
+                 len(self.total_snps), len(self.causal_snps))
+        cohort_idx, prevalence_idx, total_idx, causal_idx = np.indices(shape).reshape(4, -1)
+        derived = self._get_derived()
+        
+        return pd.DataFrame({
+            'cohort_size': np.asarray(self.cohort_sizes)[cohort_idx],
+            'num_cases': np.asarray(derived['num_cases'])[cohort_idx],
+            'num_controls': np.asarray(derived['num_controls'])[cohort_idx],
+            'prevalence': np.asarray(self.prevalences)[prevalence_idx],
+            'total_snps': np.asarray(self.total_snps)[total_idx],
+            'causal_snps': np.asarray(self.causal_snps)[causal_idx],
+            'null_snps': np.asarray(derived['null_snps'])[total_idx, causal_idx]
+        })
+    
+    def get_config_dict(self) -> Dict[str, Any]:
+        """
+        Get the constructor parameters of this grid as a dictionary.
+        
+        The result is JSON-serializable and can be passed back to
+        PLINKParameterGrid(**config) to rebuild the grid, e.g. in a SLURM task.
+        
+        Returns:
+            Dictionary of grid configuration parameters
+        """
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
     
     def get_combination_name(self, combination: Dict[str, Any]) -> str:
         """
@@ -120,11 +296,24 @@ class PLINKParameterGrid:
         Returns:
             Descriptive name string
         """
-        return (f"{self.base_prefix}_"
-                f"n{combination['cohort_size']}_"
-                f"prev{combination['prevalence']:.3f}_"
-                f"snps{combination['total_snps']}_"
-                f"causal{combination['causal_snps']}")
+        return _format_combination_name(
+            self.base_prefix,
+            combination['cohort_size'],
+            combination['prevalence'],
+            combination['total_snps'],
+            combination['causal_snps']
+        )
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_combination_name(base_prefix: str, cohort_size: int, prevalence: float,
+                             total_snps: int, causal_snps: int) -> str:
+    """Format a combination name; memoized since names repeat across calls."""
+    return (f"{base_prefix}_"
+            f"n{cohort_size}_"
+            f"prev{prevalence:.3f}_"
+            f"snps{total_snps}_"
+            f"causal{causal_snps}")
 
 
 @dataclass
@@ -299,18 +488,15 @@ class PLINKSimulator:
                 
                 # Count individuals and SNPs from existing files
                 try:
-                    with open(fam_file, 'r') as f:
-                        total_individuals = sum(1 for _ in f)
-                    
-                    with open(bim_file, 'r') as f:
-                        total_snps = sum(1 for _ in f)
-                    
-                    # Count cases and controls from .fam file (phenotype in column 6)
+                    # Count individuals, cases and controls in a single pass
+                    # over the .fam file (phenotype in column 6)
+                    total_individuals = 0
                     cases = 0
                     controls = 0
                     with open(fam_file, 'r') as f:
                         for line in f:
-                            parts = line.strip().split()
+                            total_individuals += 1
+                            parts = line.split()
                             if len(parts) >= 6:
                                 phenotype = parts[5]
                                 if phenotype == '2':  # Case
@@ -318,6 +504,11 @@ class PLINKSimulator:
                                 elif phenotype == '1':  # Control
                                     controls += 1
                     
+                    # The .bim file has one line per SNP; count newlines in
+                    # large binary blocks instead of iterating over lines
+                    with open(bim_file, 'rb') as f:
+                        total_snps = sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b''))
+                    
                     return {
                         'success': True,
                         'output_prefix': output_prefix,
@@ -529,15 +720,27 @@ class PLINKParameterGridSimulator:
         
         self.logger.info("PLINK parameter grid simulation setup validation completed successfully")
     
-    def run_parameter_grid(self) -> Dict[str, Any]:
+    def run_parameter_grid(self, n_workers: Optional[int] = None,
+                           start: int = 0, end: Optional[int] = None) -> Dict[str, Any]:
         """
         Run PLINK simulations for all parameter combinations in the grid.
         
+        Args:
+            n_workers: Number of worker processes; combinations run
+                sequentially when None or 1
+            start: Index of the first combination to run
+            end: Index one past the last combination to run (None for all)
+        
         Returns:
             Dictionary with results for all combinations
         """
-        combinations = self.grid_config.get_parameter_combinations()
-        total_combinations = len(combinations)
+        if end is None:
+            end = len(self.grid_config)
+        if start == 0 and end == len(self.grid_config):
+            combinations = self.grid_config.iter_parameter_combinations()
+        else:
+            combinations = (self.grid_config.get_combination(i) for i in range(start, end))
+        total_combinations = end - start
         
         self.logger.info(f"Starting parameter grid simulation with {total_combinations} combinations")
         print(f"Running parameter grid simulation with {total_combinations} combinations...")
@@ -547,48 +750,33 @@ class PLINKParameterGridSimulator:
             'successful': 0,
             'failed': 0,
             'combination_results': [],
+            'combination_range': (start, end),
             'summary': {
                 'grid_output_dir': self.grid_config.grid_output_dir,
                 'parameters': {
-                    'cohort_sizes': self.grid_config.cohort_sizes,
-                    'prevalences': self.grid_config.prevalences,
-                    'total_snps': self.grid_config.total_snps,
-                    'causal_snps': self.grid_config.causal_snps
+                    'cohort_sizes': list(self.grid_config.cohort_sizes),
+                    'prevalences': list(self.grid_config.prevalences),
+                    'total_snps': list(self.grid_config.total_snps),
+                    'causal_snps': list(self.grid_config.causal_snps)
                 }
             }
         }
         
-        for i, combination in enumerate(combinations, 1):
-            print(f"\nProcessing combination {i}/{total_combinations}:")
-            print(f"  Cohort size: {combination['cohort_size']} "
-                  f"(Cases: {combination['num_cases']}, Controls: {combination['num_controls']})")
-            print(f"  Prevalence: {combination['prevalence']:.3f}")
-            print(f"  Total SNPs: {combination['total_snps']} "
-                  f"(Causal: {combination['causal_snps']}, Null: {combination['null_snps']})")
-            
-            try:
-                result = self._run_single_combination(combination, i)
-                if result['success']:
-                    results['successful'] += 1
-                    print(f"  ✓ Success: {result['output_prefix']}")
-                else:
-                    results['failed'] += 1
-                    print(f"  ✗ Failed: {result['error']}")
-                
-                results['combination_results'].append(result)
-                
-            except Exception as e:
-                error_msg = f"Unexpected error in combination {i}: {str(e)}"
-                self.logger.error(error_msg)
-                print(f"  ✗ Error: {error_msg}")
-                
-                results['failed'] += 1
-                results['combination_results'].append({
-                    'combination_number': i,
-                    'combination': combination,
-                    'success': False,
-                    'error': error_msg
-                })
+        if n_workers is not None and n_workers > 1:
+            # Each combination is an independent PLINK run with an explicit
+            # seed, so results match the sequential path
+            print(f"Using {n_workers} parallel workers")
+            chunksize = max(1, total_combinations // (4 * n_workers))
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                for result in executor.map(self._run_combination_safe, combinations,
+                                           count(start + 1), chunksize=chunksize):
+                    self._print_combination(result['combination'], result['combination_number'],
+                                            len(self.grid_config))
+                    self._record_result(results, result)
+        else:
+            for i, combination in enumerate(combinations, start + 1):
+                self._print_combination(combination, i, len(self.grid_config))
+                self._record_result(results, self._run_combination_safe(combination, i))
         
         # Create summary report
         self._create_summary_report(results)
@@ -598,6 +786,42 @@ class PLINKParameterGridSimulator:
         
         return results
     
+    @staticmethod
+    def _print_combination(combination: Dict[str, Any], combination_number: int, total_combinations: int):
+        """Print the parameters of a combination."""
+        print(f"\nProcessing combination {combination_number}/{total_combinations}:")
+        print(f"  Cohort size: {combination['cohort_size']} "
+              f"(Cases: {combination['num_cases']}, Controls: {combination['num_controls']})")
+        print(f"  Prevalence: {combination['prevalence']:.3f}")
+        print(f"  Total SNPs: {combination['total_snps']} "
+              f"(Causal: {combination['causal_snps']}, Null: {combination['null_snps']})")
+    
+    @staticmethod
+    def _record_result(results: Dict[str, Any], result: Dict[str, Any]):
+        """Add a combination result to the aggregated grid results."""
+        if result['success']:
+            results['successful'] += 1
+            print(f"  ✓ Success: {result['output_prefix']}")
+        else:
+            results['failed'] += 1
+            print(f"  ✗ Failed: {result['error']}")
+        
+        results['combination_results'].append(result)
+    
+    def _run_combination_safe(self, combination: Dict[str, Any], combination_number: int) -> Dict[str, Any]:
+        """Run a single combination, converting unexpected errors into a failed result."""
+        try:
+            return self._run_single_combination(combination, combination_number)
+        except Exception as e:
+            error_msg = f"Unexpected error in combination {combination_number}: {str(e)}"
+            self.logger.error(error_msg)
+            return {
+                'combination_number': combination_number,
+                'combination': combination,
+                'success': False,
+                'error': error_msg
+            }
+    
     def _run_single_combination(self, combination: Dict[str, Any], combination_number: int) -> Dict[str, Any]:
         """
         Run PLINK simulation for a single parameter combination.
@@ -647,7 +871,7 @@ class PLINKParameterGridSimulator:
             disease_prevalence=combination['prevalence'],
             snp_sets=snp_sets,
             plink_executable=self.grid_config.plink_executable,
-            random_seed=self.grid_config.random_seed
+            random_seed=self.grid_config.get_combination_seed(combination_number - 1)
         )
         
         # Run simulation
@@ -667,7 +891,13 @@ class PLINKParameterGridSimulator:
     
     def _create_summary_report(self, results: Dict[str, Any]):
         """Create a summary report of the parameter grid simulation."""
-        summary_file = os.path.join(self.grid_config.grid_output_dir, "grid_summary.txt")
+        # Partial runs (e.g. one SLURM chunk) get their own summary file
+        start, end = results['combination_range']
+        if start == 0 and end == len(self.grid_config):
+            summary_name = "grid_summary.txt"
+        else:
+            summary_name = f"grid_summary_{start + 1}-{end}.txt"
+        summary_file = os.path.join(self.grid_config.grid_output_dir, summary_name)
         
         with open(summary_file, 'w') as f:
             f.write("PLINK Parameter Grid Simulation Summary\n")
@@ -248,7 +248,7 @@ class GCTASimulator:
             "successful": len(successful),
             "failed": len(failed),
             "success_rate": len(successful) / len(self.simulation_results) * 100,
-            "parameter_combinations": len(self.config.get_parameter_grid()),
+            "parameter_combinations": self.config.get_num_combinations(),
             "output_directory": self.config.output_dir
         }
     
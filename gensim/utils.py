@@ -4,6 +4,7 @@ Utility functions for GCTA simulation workflows.
 
 import os
 import random
+import shutil
 import subprocess
 import logging
 import pandas as pd
@@ -44,6 +45,9 @@ class GCTAUtils:
     @staticmethod
     def check_gcta_installation(executable: str = "gcta64") -> bool:
         """Check if GCTA is installed and accessible."""
+        # Avoid spawning a process when the executable is not on PATH
+        if shutil.which(executable) is None:
+            return False
         try:
             result = subprocess.run(
                 [executable, "--help"], 
@@ -4,7 +4,9 @@ Command-line interface for gensim - genomic data simulation using GCTA.
 """
 
 import argparse
+import csv
 import json
+import os
 import sys
 from pathlib import Path
 
@@ -98,10 +100,48 @@ def create_plink_dataset(args) -> int:
         return 1
 
 
+def write_grid_dry_run(grid_config: PLINKParameterGrid, stream=None) -> int:
+    """
+    Write the combinations of a parameter grid as CSV without running PLINK.
+    
+    Each row lists the combination parameters, the expected .bed path and its
+    estimated size (PLINK packs four genotypes per byte plus a 3-byte header).
+    
+    Args:
+        grid_config: Parameter grid to enumerate
+        stream: Output stream (defaults to stdout)
+        
+    Returns:
+        Total estimated size of all .bed files in bytes
+    """
+    stream = stream or sys.stdout
+    writer = csv.writer(stream)
+    writer.writerow([
+        "index", "cohort_size", "num_cases", "num_controls", "prevalence",
+        "total_snps", "causal_snps", "null_snps", "bed_file", "estimated_bed_bytes"
+    ])
+    
+    total_bytes = 0
+    for i, combo in enumerate(grid_config.iter_parameter_combinations(), 1):
+        name = grid_config.get_combination_name(combo)
+        bed_file = os.path.join(grid_config.grid_output_dir, name, f"{name}.bed")
+        bed_bytes = 3 + combo['total_snps'] * ((combo['cohort_size'] + 3) // 4)
+        total_bytes += bed_bytes
+        writer.writerow([
+            i, combo['cohort_size'], combo['num_cases'], combo['num_controls'],
+            combo['prevalence'], combo['total_snps'], combo['causal_snps'],
+            combo['null_snps'], bed_file, bed_bytes
+        ])
+    
+    return total_bytes
+
+
 def create_parameter_grid(args) -> int:
     """Create multiple PLINK datasets with parameter grid combinations."""
     try:
-        print("Creating parameter grid of PLINK datasets...")
+        # A dry run writes only the CSV to stdout
+        if not args.dry_run:
+            print("Creating parameter grid of PLINK datasets...")
         
         # Parse grid parameters (support comma-separated lists)
         def parse_int_list(value_str):
@@ -136,12 +176,19 @@ def create_parameter_grid(args) -> int:
             het_odds_ratio=args.grid_het_or,
             hom_odds_ratio=hom_or,
             plink_executable=args.plink_executable,
-            random_seed=args.random_seed
+            random_seed=args.random_seed,
+            create_output_dir=not args.dry_run
         )
         
+        if args.dry_run:
+            total_bytes = write_grid_dry_run(grid_config)
+            print(f"# Total estimated .bed size: {total_bytes} bytes "
+                  f"({total_bytes / 1024**3:.2f} GB)", file=sys.stderr)
+            return 0
+        
         # Run parameter grid simulation
         grid_simulator = PLINKParameterGridSimulator(grid_config)
-        results = grid_simulator.run_parameter_grid()
+        results = grid_simulator.run_parameter_grid(n_workers=args.workers)
         
         # Print summary
         print(f"\n{'='*60}")
@@ -165,7 +212,8 @@ def create_parameter_grid(args) -> int:
         return 1
 
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser."""
     parser = argparse.ArgumentParser(
         description="Generate simulated genomic data using GCTA",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -199,6 +247,12 @@ Examples:
     --grid-total-snps "5000,10000,20000" \\
     --grid-causal-snps "50,100,200" \\
     --grid-output-dir "my_parameter_grid"
+  
+  # Run parameter grid combinations in parallel on 8 local cores
+  python main.py --create-parameter-grid --grid-cohort-sizes "500,1000,2000" --workers 8
+  
+  # Preview parameter grid combinations and disk usage without running PLINK
+  python main.py --create-parameter-grid --grid-cohort-sizes "500,1000" --dry-run
         """
     )
     
@@ -345,8 +399,19 @@ Examples:
     parser.add_argument("--grid-hom-or", 
                        default="mult",
                        help="Homozygote odds ratio for causal SNPs ('mult' or float)")
+    parser.add_argument("--workers", 
+                       type=int, 
+                       default=1,
+                       help="Number of parallel worker processes for parameter grid simulation")
+    parser.add_argument("--dry-run", 
+                       action="store_true",
+                       help="List parameter grid combinations as CSV without running PLINK")
     
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
     
     # Handle create-config option
     if args.create_config:
@@ -393,7 +458,7 @@ Examples:
         # Add grid parameters or single simulation parameters
         if args.single:
             # Single simulation mode
-            if not all([args.cohort_size, args.num_causal, args.heritability]):
+            if args.cohort_size is None or args.num_causal is None or args.heritability is None:
                 print("Error: --cohort-size, --num-causal, and --heritability are required for single simulation")
                 return 1
             
@@ -6,14 +6,17 @@ This module demonstrates how to create parameter grids for PLINK dataset generat
 allowing systematic exploration of different simulation parameters.
 """
 
+import sys
+
 from gensim import PLINKParameterGrid, PLINKParameterGridSimulator
 
 
 def example_basic_parameter_grid():
     """Basic parameter grid with a few combinations."""
-    print("=" * 60)
-    print("BASIC PARAMETER GRID EXAMPLE")
-    print("=" * 60)
+    lines = []
+    lines.append("=" * 60)
+    lines.append("BASIC PARAMETER GRID EXAMPLE")
+    lines.append("=" * 60)
     
     # Define a simple parameter grid
     grid_config = PLINKParameterGrid(
@@ -25,30 +28,33 @@ def example_basic_parameter_grid():
         base_prefix="basic_dataset"
     )
     
-    print(f"This will create {2*2*2*2} = 16 dataset combinations")
+    lines.append(f"This will create {2*2*2*2} = 16 dataset combinations")
     
     # Check combinations without running
-    combinations = grid_config.get_parameter_combinations()
-    print(f"\nFirst few combinations:")
-    for i, combo in enumerate(combinations[:3]):
-        print(f"  {i+1}. Cohort: {combo['cohort_size']}, "
-              f"Prevalence: {combo['prevalence']:.3f}, "
-              f"SNPs: {combo['total_snps']}, "
-              f"Causal: {combo['causal_snps']}")
+    lines.append(f"\nFirst few combinations:")
+    for i in range(3):
+        combo = grid_config.get_combination(i)
+        lines.append(f"  {i+1}. Cohort: {combo['cohort_size']}, "
+                     f"Prevalence: {combo['prevalence']:.3f}, "
+                     f"SNPs: {combo['total_snps']}, "
+                     f"Causal: {combo['causal_snps']}")
     
-    print(f"  ... and {len(combinations)-3} more")
+    lines.append(f"  ... and {len(grid_config)-3} more")
     
     # Uncomment to actually run the simulation
     # simulator = PLINKParameterGridSimulator(grid_config)
     # results = simulator.run_parameter_grid()
     # print(f"\nResults: {results['successful']}/{results['total_combinations']} successful")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def example_comprehensive_parameter_grid():
     """Comprehensive parameter grid for thorough analysis."""
-    print("=" * 60)
-    print("COMPREHENSIVE PARAMETER GRID EXAMPLE")
-    print("=" * 60)
+    lines = []
+    lines.append("=" * 60)
+    lines.append("COMPREHENSIVE PARAMETER GRID EXAMPLE")
+    lines.append("=" * 60)
     
     # Define a comprehensive parameter grid
     grid_config = PLINKParameterGrid(
@@ -66,29 +72,31 @@ def example_comprehensive_parameter_grid():
         random_seed=42
     )
     
-    total_combinations = len(grid_config.get_parameter_combinations())
-    print(f"This will create {4*4*4*4} = {total_combinations} dataset combinations")
-    print("WARNING: This is a large grid and may take significant time to complete!")
+    total_combinations = len(grid_config)
+    lines.append(f"This will create {4*4*4*4} = {total_combinations} dataset combinations")
+    lines.append("WARNING: This is a large grid and may take significant time to complete!")
     
     # Show some example combinations
-    combinations = grid_config.get_parameter_combinations()
-    print(f"\nSample combinations:")
-    for i in [0, len(combinations)//4, len(combinations)//2, -1]:
-        combo = combinations[i]
+    lines.append(f"\nSample combinations:")
+    for i in [0, len(grid_config)//4, len(grid_config)//2, -1]:
+        combo = grid_config.get_combination(i)
         name = grid_config.get_combination_name(combo)
-        print(f"  {name}")
-        print(f"    Cohort: {combo['cohort_size']} individuals "
-              f"({combo['num_cases']} cases, {combo['num_controls']} controls)")
-        print(f"    Prevalence: {combo['prevalence']:.3f}")
-        print(f"    SNPs: {combo['total_snps']} total ({combo['causal_snps']} causal, {combo['null_snps']} null)")
-        print()
+        lines.append(f"  {name}")
+        lines.append(f"    Cohort: {combo['cohort_size']} individuals "
+                     f"({combo['num_cases']} cases, {combo['num_controls']} controls)")
+        lines.append(f"    Prevalence: {combo['prevalence']:.3f}")
+        lines.append(f"    SNPs: {combo['total_snps']} total ({combo['causal_snps']} causal, {combo['null_snps']} null)")
+        lines.append("")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def example_disease_focused_grid():
     """Parameter grid focused on disease association studies."""
-    print("=" * 60)
-    print("DISEASE-FOCUSED PARAMETER GRID EXAMPLE")
-    print("=" * 60)
+    lines = []
+    lines.append("=" * 60)
+    lines.append("DISEASE-FOCUSED PARAMETER GRID EXAMPLE")
+    lines.append("=" * 60)
     
     grid_config = PLINKParameterGrid(
         cohort_sizes=[1000, 2000, 5000],             # Realistic study sizes
@@ -105,22 +113,24 @@ def example_disease_focused_grid():
         random_seed=123
     )
     
-    combinations = grid_config.get_parameter_combinations()
-    print(f"This grid creates {len(combinations)} disease-focused datasets")
+    lines.append(f"This grid creates {len(grid_config)} disease-focused datasets")
     
     # Show power calculation estimates
-    print("\nExpected statistical power varies by:")
-    print("- Sample size (larger = more power)")
-    print("- Disease prevalence (affects case-control balance)")
-    print("- Number of causal SNPs (more SNPs = distributed effect)")
-    print("- Effect size (odds ratio = 2.0 is strong)")
+    lines.append("\nExpected statistical power varies by:")
+    lines.append("- Sample size (larger = more power)")
+    lines.append("- Disease prevalence (affects case-control balance)")
+    lines.append("- Number of causal SNPs (more SNPs = distributed effect)")
+    lines.append("- Effect size (odds ratio = 2.0 is strong)")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def example_custom_configuration():
     """Example with custom simulation parameters."""
-    print("=" * 60)
-    print("CUSTOM CONFIGURATION EXAMPLE")
-    print("=" * 60)
+    lines = []
+    lines.append("=" * 60)
+    lines.append("CUSTOM CONFIGURATION EXAMPLE")
+    lines.append("=" * 60)
     
     grid_config = PLINKParameterGrid(
         cohort_sizes=[800, 1200],
@@ -138,17 +148,19 @@ def example_custom_configuration():
         random_seed=456
     )
     
-    combinations = grid_config.get_parameter_combinations()
-    print(f"Custom grid with {len(combinations)} combinations")
+    lines.append(f"Custom grid with {len(grid_config)} combinations")
     
     # Show the effect of case_control_ratio
-    print(f"\nWith case_control_ratio = 2.0:")
-    for combo in combinations[:2]:
+    lines.append(f"\nWith case_control_ratio = 2.0:")
+    for i in range(2):
+        combo = grid_config.get_combination(i)
         total = combo['cohort_size']
         cases = combo['num_cases']
         controls = combo['num_controls']
         ratio = cases / controls
-        print(f"  Cohort {total}: {cases} cases, {controls} controls (ratio: {ratio:.1f})")
+        lines.append(f"  Cohort {total}: {cases} cases, {controls} controls (ratio: {ratio:.1f})")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def main():
@@ -179,7 +191,8 @@ def main():
     print("  --grid-cohort-sizes '500,1000' \\")
     print("  --grid-prevalences '0.01,0.05' \\")
     print("  --grid-total-snps '5000,10000' \\")
-    print("  --grid-causal-snps '50,100'")
+    print("  --grid-causal-snps '50,100' \\")
+    print("  --workers 4")
 
 
 if __name__ == "__main__":
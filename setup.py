@@ -1,44 +1,10 @@
 """
 Setup script for gensim package.
-"""
 
-from setuptools import setup, find_packages
+Package metadata lives in pyproject.toml; this shim is kept for tools
+that still invoke setup.py directly.
+"""
 
-with open("README.md", "r", encoding="utf-8") as fh:
-    long_description = fh.read()
+from setuptools import setup
 
-setup(
-    name="gensim",
-    version="0.1.0",
-    author="Dennis Gankin",
-    author_email="",
-    description="A Python package for generating simulated genomic data using GCTA",
-    long_description=long_description,
-    long_description_content_type="text/markdown",
-    url="https://github.com/DennisGankin/gensim",
-    packages=find_packages(),
-    classifiers=[
-        "Development Status :: 3 - Alpha",
-        "Intended Audience :: Science/Research",
-        "Topic :: Scientific/Engineering :: Bio-Informatics",
-        "License :: OSI Approved :: MIT License",
-        "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.7",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
-        "Programming Language :: Python :: 3.10",
-        "Programming Language :: Python :: 3.11",
-    ],
-    python_requires=">=3.7",
-    install_requires=[
-        "pandas>=1.0.0",
-        "numpy>=1.18.0",
-    ],
-    entry_points={
-        "console_scripts": [
-            "gensim=main:main",
-        ],
-    },
-    include_package_data=True,
-    zip_safe=False,
-)
+setup()
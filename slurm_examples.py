@@ -6,21 +6,36 @@ This script demonstrates different ways to submit parameter grid simulations
 to SLURM clusters for parallel execution.
 """
 
+import functools
 import os
+import shutil
 import subprocess
 import sys
 from pathlib import Path
 
 
+@functools.lru_cache(maxsize=1)
+def _slurm_available() -> bool:
+    """Check whether SLURM is available, probing squeue only if it is on PATH."""
+    if shutil.which('squeue') is None:
+        return False
+    try:
+        subprocess.run(['squeue', '--version'], capture_output=True, check=True, timeout=2)
+        return True
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+        return False
+
+
 def example_chunked_jobs():
     """Example of submitting chunked parameter grid jobs."""
-    print("=" * 60)
-    print("CHUNKED SLURM JOBS EXAMPLE")
-    print("=" * 60)
+    lines = []
+    lines.append("=" * 60)
+    lines.append("CHUNKED SLURM JOBS EXAMPLE")
+    lines.append("=" * 60)
     
-    print("This approach splits the parameter grid into chunks and submits")
-    print("a separate SLURM job for each chunk. Good for moderate-sized grids.")
-    print()
+    lines.append("This approach splits the parameter grid into chunks and submits them")
+    lines.append("as one SLURM array job, one task per chunk. Good for moderate-sized grids.")
+    lines.append("")
     
     # Example command
     cmd = [
@@ -37,36 +52,43 @@ def example_chunked_jobs():
         "--dry-run"  # Remove this to actually submit
     ]
     
-    print("Example command:")
-    print(" ".join(cmd))
-    print()
+    lines.append("Example command:")
+    lines.append(" ".join(cmd))
+    lines.append("")
     
-    print("This creates a 3×3×3×3 = 81 combination grid split into 8 chunks")
-    print("Each chunk will process ~10-11 combinations")
-    print()
+    lines.append("This creates a 3×3×3×3 = 81 combination grid split into 8 chunks")
+    lines.append("Each chunk covers a contiguous range of combination indices (~10-11 combinations)")
+    lines.append("")
     
     # Show what this would do
     grid_size = 3 * 3 * 3 * 3
     num_jobs = 8
-    combinations_per_job = grid_size // num_jobs
-    
-    print(f"Grid breakdown:")
-    print(f"  Total combinations: {grid_size}")
-    print(f"  Number of SLURM jobs: {num_jobs}")
-    print(f"  Combinations per job: ~{combinations_per_job}")
-    print(f"  Expected runtime: ~2 hours per job")
-    print()
+    # Same split as submit_parameter_grid_slurm: the first chunks get the extra combinations
+    chunk_size, remainder = divmod(grid_size, num_jobs)
+    bounds = [i * chunk_size + min(i, remainder) for i in range(num_jobs + 1)]
+    ranges = list(zip(bounds[:-1], bounds[1:]))
+    
+    lines.append(f"Grid breakdown:")
+    lines.append(f"  Total combinations: {grid_size}")
+    lines.append(f"  Number of SLURM jobs: {num_jobs}")
+    lines.append(f"  Combination ranges: {', '.join(f'{start + 1}-{end}' for start, end in ranges)}")
+    lines.append(f"  Expected runtime: ~2 hours per job")
+    lines.append("")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def example_individual_jobs():
     """Example of submitting individual jobs for each combination."""
-    print("=" * 60)
-    print("INDIVIDUAL SLURM JOBS EXAMPLE")
-    print("=" * 60)
+    lines = []
+    lines.append("=" * 60)
+    lines.append("INDIVIDUAL SLURM JOBS EXAMPLE")
+    lines.append("=" * 60)
     
-    print("This approach submits one SLURM job per parameter combination.")
-    print("Maximum parallelization but creates many jobs. Good for large grids.")
-    print()
+    lines.append("This approach submits one SLURM job per parameter combination.")
+    lines.append("Deprecated: one sbatch call per combination loads the scheduler;")
+    lines.append("prefer array jobs (the default) unless your cluster disallows them.")
+    lines.append("")
     
     # Example command for smaller grid
     cmd = [
@@ -79,29 +101,33 @@ def example_individual_jobs():
         "--memory", "2G",
         "--partition", "cpu",
         "--grid-output-dir", "individual_jobs_example",
+        "--individual-jobs",
         "--dry-run"
     ]
     
-    print("Example command:")
-    print(" ".join(cmd))
-    print()
+    lines.append("Example command:")
+    lines.append(" ".join(cmd))
+    lines.append("")
     
     grid_size = 2 * 2 * 2 * 2
-    print(f"This creates {grid_size} individual SLURM jobs")
-    print("Each job processes exactly 1 combination")
-    print("Jobs can run simultaneously (limited by cluster capacity)")
-    print()
+    lines.append(f"This creates {grid_size} individual SLURM jobs")
+    lines.append("Each job processes exactly 1 combination")
+    lines.append("Jobs can run simultaneously (limited by cluster capacity)")
+    lines.append("")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def example_array_jobs():
     """Example of using SLURM array jobs."""
-    print("=" * 60)
-    print("SLURM ARRAY JOBS EXAMPLE")
-    print("=" * 60)
+    lines = []
+    lines.append("=" * 60)
+    lines.append("SLURM ARRAY JOBS EXAMPLE")
+    lines.append("=" * 60)
     
-    print("This approach uses SLURM array jobs for efficient job submission.")
-    print("Single submission creates many parallel tasks. Most efficient for very large grids.")
-    print()
+    lines.append("This approach uses SLURM array jobs for efficient job submission (the default).")
+    lines.append("Single submission creates many parallel tasks. Most efficient for very large grids.")
+    lines.append("")
     
     cmd = [
         "python", "submit_individual_slurm.py",
@@ -109,7 +135,6 @@ def example_array_jobs():
         "--prevalences", "0.001,0.01,0.05,0.1,0.2",
         "--total-snps", "5000,10000,20000,50000",
         "--causal-snps", "50,100,200,500",
-        "--use-array",
         "--time", "01:00:00",
         "--memory", "3G",
         "--partition", "cpu",
@@ -117,25 +142,29 @@ def example_array_jobs():
         "--dry-run"
     ]
     
-    print("Example command:")
-    print(" ".join(cmd))
-    print()
+    lines.append("Example command:")
+    lines.append(" ".join(cmd))
+    lines.append("")
     
     grid_size = 4 * 5 * 4 * 4
-    print(f"This creates 1 array job with {grid_size} tasks")
-    print("SLURM manages task scheduling automatically")
-    print("More efficient than individual job submission")
-    print()
+    lines.append(f"This creates 1 array job with {grid_size} tasks (--array=0-{grid_size - 1})")
+    lines.append("Each task decodes its SLURM_ARRAY_TASK_ID into one parameter combination")
+    lines.append("SLURM manages task scheduling automatically")
+    lines.append("More efficient than individual job submission")
+    lines.append("")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def example_custom_slurm_parameters():
     """Example with custom SLURM parameters for specific cluster setup."""
-    print("=" * 60)
-    print("CUSTOM SLURM PARAMETERS EXAMPLE")
-    print("=" * 60)
+    lines = []
+    lines.append("=" * 60)
+    lines.append("CUSTOM SLURM PARAMETERS EXAMPLE")
+    lines.append("=" * 60)
     
-    print("This shows how to customize SLURM parameters for your specific cluster.")
-    print()
+    lines.append("This shows how to customize SLURM parameters for your specific cluster.")
+    lines.append("")
     
     cmd = [
         "python", "submit_parameter_grid_slurm.py",
@@ -154,81 +183,87 @@ def example_custom_slurm_parameters():
         "--dry-run"
     ]
     
-    print("Example command for large-scale simulation:")
-    print(" ".join(cmd))
-    print()
+    lines.append("Example command for large-scale simulation:")
+    lines.append(" ".join(cmd))
+    lines.append("")
     
-    print("Custom parameters explained:")
-    print("  --time 08:00:00     : 8-hour time limit for large datasets")
-    print("  --memory 16G        : 16GB RAM for memory-intensive simulations")
-    print("  --cpus 4            : 4 CPUs per job (if PLINK supports parallelization)")
-    print("  --partition highmem : Use high-memory partition")
-    print("  --account myproject : Charge compute time to specific account")
-    print()
+    lines.append("Custom parameters explained:")
+    lines.append("  --time 08:00:00     : 8-hour time limit for large datasets")
+    lines.append("  --memory 16G        : 16GB RAM for memory-intensive simulations")
+    lines.append("  --cpus 4            : 4 CPUs per job (if PLINK supports parallelization)")
+    lines.append("  --partition highmem : Use high-memory partition")
+    lines.append("  --account myproject : Charge compute time to specific account")
+    lines.append("")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def example_monitoring_jobs():
     """Example of monitoring submitted jobs."""
-    print("=" * 60)
-    print("JOB MONITORING EXAMPLE")
-    print("=" * 60)
-    
-    print("After submitting jobs, you can monitor them in several ways:")
-    print()
-    
-    print("1. Automatic monitoring script (created by chunked submission):")
-    print("   ./parameter_grid_output/monitor_jobs.sh")
-    print()
-    
-    print("2. Manual SLURM commands:")
-    print("   squeue -u $USER                    # Show your jobs")
-    print("   squeue -j 12345                   # Show specific job")
-    print("   sacct -j 12345                    # Show job accounting info")
-    print("   scancel 12345                     # Cancel job")
-    print("   scancel -u $USER                  # Cancel all your jobs")
-    print()
-    
-    print("3. Check output files:")
-    print("   ls parameter_grid_output/slurm_jobs/*.out    # Stdout files")
-    print("   ls parameter_grid_output/slurm_jobs/*.err    # Stderr files")
-    print()
-    
-    print("4. Collect results:")
-    print("   find parameter_grid_output -name '*.bed' | wc -l    # Count generated datasets")
-    print("   find parameter_grid_output -name 'grid_summary.txt' # Find summary reports")
-    print()
+    lines = []
+    lines.append("=" * 60)
+    lines.append("JOB MONITORING EXAMPLE")
+    lines.append("=" * 60)
+    
+    lines.append("After submitting jobs, you can monitor them in several ways:")
+    lines.append("")
+    
+    lines.append("1. Automatic monitoring script (created by chunked submission):")
+    lines.append("   ./parameter_grid_output/monitor_jobs.sh")
+    lines.append("")
+    
+    lines.append("2. Manual SLURM commands:")
+    lines.append("   squeue -u $USER                    # Show your jobs")
+    lines.append("   squeue -j 12345                   # Show specific job")
+    lines.append("   sacct -j 12345                    # Show job accounting info")
+    lines.append("   scancel 12345                     # Cancel job")
+    lines.append("   scancel -u $USER                  # Cancel all your jobs")
+    lines.append("")
+    
+    lines.append("3. Check output files:")
+    lines.append("   ls parameter_grid_output/slurm_jobs/*.out    # Stdout files")
+    lines.append("   ls parameter_grid_output/slurm_jobs/*.err    # Stderr files")
+    lines.append("")
+    
+    lines.append("4. Collect results:")
+    lines.append("   find parameter_grid_output -name '*.bed' | wc -l    # Count generated datasets")
+    lines.append("   find parameter_grid_output -name 'grid_summary.txt' # Find summary reports")
+    lines.append("")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def example_failure_recovery():
     """Example of handling and recovering from job failures."""
-    print("=" * 60)
-    print("FAILURE RECOVERY EXAMPLE")
-    print("=" * 60)
-    
-    print("Sometimes jobs fail due to various reasons. Here's how to handle failures:")
-    print()
-    
-    print("1. Identify failed jobs:")
-    print("   sacct -u $USER --state=FAILED     # Show failed jobs")
-    print("   grep -r 'FAILED' parameter_grid_output/slurm_jobs/*.err")
-    print()
-    
-    print("2. Check failure reasons:")
-    print("   # Common issues:")
-    print("   # - Time limit exceeded (increase --time)")
-    print("   # - Memory limit exceeded (increase --memory)")
-    print("   # - PLINK executable not found (check --plink-executable)")
-    print("   # - Disk space issues")
-    print("   # - Network/filesystem problems")
-    print()
-    
-    print("3. Resubmit failed combinations:")
-    print("   # Option A: Resubmit entire failed chunk")
-    print("   # Option B: Create new grid with only failed parameter combinations")
-    print("   # Option C: Submit individual jobs for failed combinations")
-    print()
-    
-    print("4. Example resubmission:")
+    lines = []
+    lines.append("=" * 60)
+    lines.append("FAILURE RECOVERY EXAMPLE")
+    lines.append("=" * 60)
+    
+    lines.append("Sometimes jobs fail due to various reasons. Here's how to handle failures:")
+    lines.append("")
+    
+    lines.append("1. Identify failed jobs:")
+    lines.append("   sacct -u $USER --state=FAILED     # Show failed jobs")
+    lines.append("   grep -r 'FAILED' parameter_grid_output/slurm_jobs/*.err")
+    lines.append("")
+    
+    lines.append("2. Check failure reasons:")
+    lines.append("   # Common issues:")
+    lines.append("   # - Time limit exceeded (increase --time)")
+    lines.append("   # - Memory limit exceeded (increase --memory)")
+    lines.append("   # - PLINK executable not found (check --plink-executable)")
+    lines.append("   # - Disk space issues")
+    lines.append("   # - Network/filesystem problems")
+    lines.append("")
+    
+    lines.append("3. Resubmit failed combinations:")
+    lines.append("   # Option A: Resubmit entire failed chunk")
+    lines.append("   # Option B: Create new grid with only failed parameter combinations")
+    lines.append("   # Option C: Submit individual jobs for failed combinations")
+    lines.append("")
+    
+    lines.append("4. Example resubmission:")
     resubmit_cmd = [
         "python", "submit_individual_slurm.py",
         "--cohort-sizes", "5000",      # Only the failed combination
@@ -239,47 +274,52 @@ def example_failure_recovery():
         "--memory", "32G",             # Increased memory
         "--grid-output-dir", "recovery_jobs"
     ]
-    print("   " + " ".join(resubmit_cmd))
-    print()
+    lines.append("   " + " ".join(resubmit_cmd))
+    lines.append("")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def show_best_practices():
     """Show best practices for SLURM parameter grid submission."""
-    print("=" * 60)
-    print("BEST PRACTICES")
-    print("=" * 60)
-    
-    print("1. Start small:")
-    print("   - Test with a small grid (2×2×2×2 = 16 combinations)")
-    print("   - Use --dry-run flag to check scripts before submission")
-    print("   - Verify one combination works before scaling up")
-    print()
-    
-    print("2. Choose appropriate job size:")
-    print("   - Small grids (< 50 combinations): Individual jobs")
-    print("   - Medium grids (50-500 combinations): Chunked jobs (5-20 chunks)")
-    print("   - Large grids (> 500 combinations): Array jobs")
-    print()
-    
-    print("3. Resource allocation:")
-    print("   - Start with conservative estimates (1-2 hours, 2-4GB RAM)")
-    print("   - Monitor actual usage and adjust")
-    print("   - Consider SNP count and sample size when estimating resources")
-    print()
-    
-    print("4. Cluster etiquette:")
-    print("   - Don't submit thousands of jobs simultaneously")
-    print("   - Use appropriate partitions (don't use GPU partition for CPU-only work)")
-    print("   - Set reasonable time limits (don't ask for 24 hours if you need 1 hour)")
-    print("   - Clean up failed/cancelled jobs")
-    print()
-    
-    print("5. Data management:")
-    print("   - Organize output in clear directory structure")
-    print("   - Keep track of parameter combinations and their outputs")
-    print("   - Compress or archive completed datasets to save space")
-    print("   - Use meaningful naming conventions")
-    print()
+    lines = []
+    lines.append("=" * 60)
+    lines.append("BEST PRACTICES")
+    lines.append("=" * 60)
+    
+    lines.append("1. Start small:")
+    lines.append("   - Test with a small grid (2×2×2×2 = 16 combinations)")
+    lines.append("   - Use --dry-run flag to check scripts before submission")
+    lines.append("   - Verify one combination works before scaling up")
+    lines.append("")
+    
+    lines.append("2. Choose appropriate job size:")
+    lines.append("   - Most grids: Array jobs (default of submit_individual_slurm.py)")
+    lines.append("   - Long-running combinations: Chunked jobs (5-20 chunks)")
+    lines.append("   - Individual jobs (--individual-jobs) only if arrays are unavailable")
+    lines.append("")
+    
+    lines.append("3. Resource allocation:")
+    lines.append("   - Start with conservative estimates (1-2 hours, 2-4GB RAM)")
+    lines.append("   - Monitor actual usage and adjust")
+    lines.append("   - Consider SNP count and sample size when estimating resources")
+    lines.append("")
+    
+    lines.append("4. Cluster etiquette:")
+    lines.append("   - Don't submit thousands of jobs simultaneously")
+    lines.append("   - Use appropriate partitions (don't use GPU partition for CPU-only work)")
+    lines.append("   - Set reasonable time limits (don't ask for 24 hours if you need 1 hour)")
+    lines.append("   - Clean up failed/cancelled jobs")
+    lines.append("")
+    
+    lines.append("5. Data management:")
+    lines.append("   - Organize output in clear directory structure")
+    lines.append("   - Keep track of parameter combinations and their outputs")
+    lines.append("   - Compress or archive completed datasets to save space")
+    lines.append("   - Use meaningful naming conventions")
+    lines.append("")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def main():
@@ -291,11 +331,8 @@ def main():
     print()
     
     # Check if SLURM is available
-    try:
-        subprocess.run(['squeue', '--version'], capture_output=True, check=True)
-        slurm_available = True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        slurm_available = False
+    slurm_available = _slurm_available()
+    if not slurm_available:
         print("⚠️  SLURM not detected. Examples are for reference only.")
         print()
     
@@ -7,224 +7,490 @@ providing maximum parallelization for large parameter grids.
 """
 
 import os
+import re
 import sys
+import shlex
+import string
 import argparse
+import functools
 import subprocess
 import json
-from typing import List, Dict, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 
 from gensim import PLINKParameterGrid
 
 
-def create_single_combination_script(
-    combination: Dict[str, Any],
-    combination_id: int,
-    base_config: PLINKParameterGrid,
-    slurm_args: Dict[str, Any]
-) -> str:
+# Python worker shared by individual and array jobs. It rebuilds the grid from
+# grid_config.json and runs one task, given either as an explicit 0-based
+# index or taken from SLURM_ARRAY_TASK_ID (+ GRID_TASK_OFFSET). A task covers
+# GRID_BATCH_SIZE consecutive combinations (default 1).
+WORKER_SCRIPT = """\
+import json
+import os
+import sys
+
+# Jobs cd to the submission directory; make gensim importable from there
+sys.path.insert(0, os.getcwd())
+from gensim import PLINKParameterGrid, PLINKSimulationConfig, PLINKSimulationSet, PLINKSimulator
+
+# Job scripts embed the config so concurrent tasks do not all open the same
+# shared file at start-up; the file on disk is the fallback
+if os.environ.get('GRID_CONFIG_JSON'):
+    grid = PLINKParameterGrid(**json.loads(os.environ['GRID_CONFIG_JSON']))
+else:
+    with open(sys.argv[1], 'r') as f:
+        grid = PLINKParameterGrid(**json.load(f))
+
+if len(sys.argv) > 2:
+    task_id = int(sys.argv[2])
+else:
+    task_id = int(os.environ['SLURM_ARRAY_TASK_ID']) + int(os.environ.get('GRID_TASK_OFFSET', 0))
+batch_size = int(os.environ.get('GRID_BATCH_SIZE', 1))
+
+start = task_id * batch_size
+end = min(start + batch_size, len(grid))
+if start >= len(grid):
+    print('Task ID {} exceeds number of combinations {}'.format(task_id, len(grid)))
+    sys.exit(1)
+
+
+def run_combination(index):
+    combination = grid.get_combination(index)
+    combo_name = grid.get_combination_name(combination)
+    combo_dir = os.path.join(grid.grid_output_dir, combo_name)
+    
+    print('Processing combination {}: {}'.format(index + 1, combo_name))
+    print('  Cohort: {cohort_size} ({num_cases} cases, {num_controls} controls)'.format(**combination))
+    print('  Prevalence: {prevalence:.3f}'.format(**combination))
+    print('  SNPs: {total_snps} ({causal_snps} causal, {null_snps} null)'.format(**combination))
+    
+    # Create SNP sets
+    snp_sets = [
+        PLINKSimulationSet(
+            num_snps=combination['null_snps'],
+            label='null',
+            min_freq=grid.min_freq,
+            max_freq=grid.max_freq,
+            het_odds_ratio=1.0,
+            hom_odds_ratio=1.0
+        )
+    ]
+    
+    if combination['causal_snps'] > 0:
+        snp_sets.append(
+            PLINKSimulationSet(
+                num_snps=combination['causal_snps'],
+                label='causal',
+                min_freq=grid.min_freq,
+                max_freq=grid.max_freq,
+                het_odds_ratio=grid.het_odds_ratio,
+                hom_odds_ratio=grid.hom_odds_ratio
+            )
+        )
+    
+    # Create configuration
+    config = PLINKSimulationConfig(
+        output_prefix=combo_name,
+        output_dir=combo_dir,
+        num_cases=combination['num_cases'],
+        num_controls=combination['num_controls'],
+        disease_prevalence=combination['prevalence'],
+        snp_sets=snp_sets,
+        plink_executable=grid.plink_executable,
+        random_seed=grid.get_combination_seed(index)
+    )
+    
+    # Run simulation
+    simulator = PLINKSimulator(config)
+    result = simulator.run_simulation()
+    
+    if result['success']:
+        print('✓ Simulation completed successfully!')
+        if 'statistics' in result:
+            stats = result['statistics']
+            print('  Generated: {} individuals, {} SNPs'.format(stats['total_individuals'], stats['total_snps']))
+            print('  Cases: {}, Controls: {}'.format(stats['cases'], stats['controls']))
+    else:
+        print('✗ Simulation failed!')
+        print('  Error: {}'.format(result.get('error', 'Unknown error')))
+    
+    return {'combination_name': combo_name, 'success': result['success'],
+            'error': result.get('error')}
+
+
+summary = {index: run_combination(index) for index in range(start, end)}
+
+if batch_size > 1:
+    summary_file = os.path.join(os.path.dirname(sys.argv[1]), 'task_{}_summary.json'.format(task_id))
+    with open(summary_file, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+if not all(entry['success'] for entry in summary.values()):
+    sys.exit(1)
+"""
+
+
+def grid_config_json(grid_config: PLINKParameterGrid) -> str:
     """
-    Create a SLURM script for a single parameter combination.
+    Serialize the grid configuration as compact JSON.
+    
+    The same string is written to grid_config.json and exported to jobs as
+    GRID_CONFIG_JSON, so tasks can rebuild the grid without reading the file.
     
     Args:
-        combination: Parameter combination dictionary
-        combination_id: Unique ID for this combination
-        base_config: Base parameter grid configuration
-        slurm_args: SLURM job arguments
+        grid_config: Parameter grid configuration
         
     Returns:
-        Path to created SLURM script
+        Compact JSON string
     """
-    # Create combination-specific output directory
-    combo_name = base_config.get_combination_name(combination)
-    combo_dir = os.path.join(base_config.grid_output_dir, combo_name)
+    return json.dumps(grid_config.get_config_dict(), separators=(',', ':'))
+
+
+def write_worker_files(grid_config: PLINKParameterGrid, output_dir: str) -> Tuple[str, str]:
+    """
+    Write the shared worker script and grid configuration once per submission.
     
-    # SLURM script content
-    job_name = f"plink_{combo_name}"
-    slurm_output_dir = os.path.join(base_config.grid_output_dir, "slurm_logs")
-    os.makedirs(slurm_output_dir, exist_ok=True)
+    Args:
+        grid_config: Parameter grid configuration
+        output_dir: Directory to write _worker.py and grid_config.json into
+        
+    Returns:
+        Tuple of (worker script path, grid config path)
+    """
+    os.makedirs(output_dir, exist_ok=True)
     
-    output_file = os.path.join(slurm_output_dir, f"{job_name}.out")
-    error_file = os.path.join(slurm_output_dir, f"{job_name}.err")
+    grid_config_file = os.path.join(output_dir, "grid_config.json")
+    with open(grid_config_file, 'w') as f:
+        f.write(grid_config_json(grid_config))
     
-    # Prepare values to avoid f-string issues
-    hom_or_value = "'mult'" if base_config.hom_odds_ratio == 'mult' else str(base_config.hom_odds_ratio)
-    random_seed_value = str(base_config.random_seed) if base_config.random_seed else 'None'
+    worker_file = os.path.join(output_dir, "_worker.py")
+    with open(worker_file, 'w') as f:
+        f.write(WORKER_SCRIPT)
     
-    script_content = f"""#!/bin/bash
+    return worker_file, grid_config_file
 
-#SBATCH --job-name={job_name}
-#SBATCH --output={output_file}
-#SBATCH --error={error_file}
-#SBATCH --time={slurm_args.get('time', '01:00:00')}
-#SBATCH --mem-per-cpu={slurm_args.get('memory', '2G')}
-#SBATCH --cpus-per-task={slurm_args.get('cpus', 1)}
-#SBATCH --partition={slurm_args.get('partition', 'cpu')}"""
 
-    if slurm_args.get('account'):
-        script_content += f"\n#SBATCH --account={slurm_args['account']}"
-    
-    # Add array job support if specified
-    if slurm_args.get('array'):
-        script_content += f"\n#SBATCH --array={slurm_args['array']}"
-    
-    script_content += f"""
+# Shared by individual and array job scripts; $$ escapes shell variables
+JOB_SCRIPT_TEMPLATE = string.Template("""\
+#!/bin/bash
+
+${directives}
+${resources}
 
-# Load modules and activate mamba environment
-# module load mamba  # Uncomment if needed on your cluster
-source ~/.bashrc
-mamba activate gensim
+# Reuse the submitting environment instead of initializing mamba in every job
+export PATH=${path}
+PYTHON=${python}
 
 # Set working directory
-cd {os.getcwd()}
+cd ${workdir}
 
 # Print job information
-echo "Job started at: $(date)"
-echo "Job ID: $SLURM_JOB_ID"
-echo "Node: $SLURM_NODELIST"
-echo "Combination: {combo_name}"
-echo "Working directory: $(pwd)"
+echo "Job started at: $$(date)"
+echo "Job ID: $$SLURM_JOB_ID"
+echo "Node: $$SLURM_NODELIST"
+${job_info}echo "Working directory: $$(pwd)"
 echo ""
 
-# Create output directory
-mkdir -p "{combo_dir}"
+# Run the worker
+${worker_env}"$$PYTHON" ${worker_command}
 
-# Run single combination
-echo "Running PLINK simulation for combination {combination_id}:"
-echo "  Cohort size: {combination['cohort_size']} (Cases: {combination['num_cases']}, Controls: {combination['num_controls']})"
-echo "  Prevalence: {combination['prevalence']:.3f}"
-echo "  Total SNPs: {combination['total_snps']} (Causal: {combination['causal_snps']}, Null: {combination['null_snps']})"
 echo ""
+echo "Job finished at: $$(date)"
+""")
 
-# Execute Python command
-python -c "
-import os
-from gensim import PLINKSimulationConfig, PLINKSimulationSet, PLINKSimulator
-
-# Create SNP sets
-snp_sets = [
-    PLINKSimulationSet(
-        num_snps={combination['null_snps']},
-        label='null',
-        min_freq={base_config.min_freq},
-        max_freq={base_config.max_freq},
-        het_odds_ratio=1.0,
-        hom_odds_ratio=1.0
-    )
-]
 
-# Add causal SNPs if any
-if {combination['causal_snps']} > 0:
-    snp_sets.append(
-        PLINKSimulationSet(
-            num_snps={combination['causal_snps']},
-            label='causal',
-            min_freq={base_config.min_freq},
-            max_freq={base_config.max_freq},
-            het_odds_ratio={base_config.het_odds_ratio},
-            hom_odds_ratio={hom_or_value}
+def _static_job_fields(slurm_args: Dict[str, Any], workdir: Optional[str] = None) -> Dict[str, str]:
+    """
+    Format the template fields shared by every job of a submission.
+    
+    Call this once per submission and pass the result to render_job_script.
+    PATH and the Python executable are read at call time.
+    """
+    resources = [
+        f"--time={slurm_args.get('time', '01:00:00')}",
+        f"--mem-per-cpu={slurm_args.get('memory', '2G')}",
+        f"--cpus-per-task={slurm_args.get('cpus', 1)}",
+        f"--partition={slurm_args.get('partition', 'cpu')}",
+    ]
+    if slurm_args.get('account'):
+        resources.append(f"--account={slurm_args['account']}")
+    
+    return {
+        'resources': "\n".join(f"#SBATCH {r}" for r in resources),
+        'path': shlex.quote(os.environ.get('PATH', '')),
+        'python': shlex.quote(sys.executable),
+        'workdir': shlex.quote(workdir or os.getcwd()),
+    }
+
+
+def render_job_script(
+    grid_config: PLINKParameterGrid,
+    slurm_args: Dict[str, Any],
+    directives: List[str],
+    worker_file: str,
+    grid_config_file: str,
+    job_info: Optional[List[str]] = None,
+    job_info_vars: Optional[Dict[str, str]] = None,
+    worker_args: Optional[List[str]] = None,
+    worker_env: Optional[Dict[str, str]] = None,
+    embed_config: bool = True,
+    workdir: Optional[str] = None,
+    static_fields: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Render a SLURM job script that runs the shared worker.
+    
+    Args:
+        grid_config: Parameter grid configuration
+        slurm_args: SLURM job arguments (time, memory, cpus, partition, account)
+        directives: Job-specific sbatch options such as --job-name and --output
+        worker_file: Path to the shared worker script
+        grid_config_file: Path to the saved grid configuration
+        job_info: Extra literal lines echoed with the job information
+        job_info_vars: Extra labels echoed with the value of a shell
+            variable, e.g. {'Array task ID': 'SLURM_ARRAY_TASK_ID'}
+        worker_args: Extra command-line arguments for the worker
+        worker_env: Extra environment variables for the worker
+        embed_config: Export the grid config as GRID_CONFIG_JSON instead of
+            having the worker read grid_config_file
+        workdir: Directory the job changes into (default: current directory)
+        static_fields: Fields from _static_job_fields computed once for the
+            submission; built from slurm_args and workdir if omitted
+        
+    Returns:
+        SLURM script content as string
+    """
+    if static_fields is None:
+        static_fields = _static_job_fields(slurm_args, workdir)
+    
+    env = {'GRID_CONFIG_JSON': grid_config_json(grid_config)} if embed_config else {}
+    env.update(worker_env or {})
+    
+    return JOB_SCRIPT_TEMPLATE.substitute(
+        static_fields,
+        directives="\n".join(f"#SBATCH {d}" for d in directives),
+        job_info="".join(
+            [f"echo {shlex.quote(line)}\n" for line in job_info or []] +
+            [f'echo {shlex.quote(label + ": ")}"${{{var}}}"\n'
+             for label, var in (job_info_vars or {}).items()]
+        ),
+        worker_env="".join(f"export {k}={shlex.quote(v)}\n" for k, v in env.items()),
+        worker_command=" ".join(
+            map(shlex.quote, [worker_file, grid_config_file, *(worker_args or [])])
         )
     )
 
-# Create PLINK configuration
-config = PLINKSimulationConfig(
-    output_prefix='{combo_name}',
-    output_dir='{combo_dir}',
-    num_cases={combination['num_cases']},
-    num_controls={combination['num_controls']},
-    disease_prevalence={combination['prevalence']},
-    snp_sets=snp_sets,
-    plink_executable='{base_config.plink_executable}',
-    random_seed={random_seed_value}
-)
-
-# Run simulation
-simulator = PLINKSimulator(config)
-result = simulator.run_simulation()
-
-if result['success']:
-    print('✓ Simulation completed successfully!')
-    if 'statistics' in result:
-        stats = result['statistics']
-        print('  Generated: {{}} individuals, {{}} SNPs'.format(stats['total_individuals'], stats['total_snps']))
-        print('  Cases: {{}}, Controls: {{}}'.format(stats['cases'], stats['controls']))
-else:
-    print('✗ Simulation failed!')
-    print('  Error: {{}}'.format(result.get('error', 'Unknown error')))
-    exit(1)
-"
 
-echo ""
-echo "Job finished at: $(date)"
-"""
+def create_combination_dirs(
+    grid_config: PLINKParameterGrid,
+    combinations: Iterable[Dict[str, Any]]
+) -> None:
+    """
+    Create the output directory of every combination from the submit host.
     
-    # Write script file
-    script_file = os.path.join(slurm_output_dir, f"{job_name}.sh")
-    with open(script_file, 'w') as f:
-        f.write(script_content)
+    Doing this in one pass before submission spares the file system from
+    many tasks creating their directories at the same moment.
+    
+    Args:
+        grid_config: Parameter grid configuration
+        combinations: Parameter combinations to create directories for
+    """
+    for combination in combinations:
+        combo_name = grid_config.get_combination_name(combination)
+        os.makedirs(os.path.join(grid_config.grid_output_dir, combo_name), exist_ok=True)
+
+
+def create_single_combination_script(
+    combination: Dict[str, Any],
+    combination_id: int,
+    base_config: PLINKParameterGrid,
+    slurm_args: Dict[str, Any],
+    worker_file: str,
+    grid_config_file: str,
+    workdir: Optional[str] = None,
+    static_fields: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Create the SLURM script content for a single parameter combination.
+    
+    The script is not written to disk; it can be piped to sbatch directly.
+    Log files go to the grid's slurm_logs directory, which must exist.
+    
+    Args:
+        combination: Parameter combination dictionary
+        combination_id: 1-based index of this combination in the grid
+        base_config: Base parameter grid configuration
+        slurm_args: SLURM job arguments
+        worker_file: Path to the shared worker script
+        grid_config_file: Path to the saved grid configuration
+        workdir: Directory the job changes into (default: current directory)
+        static_fields: Precomputed shared template fields (see render_job_script)
+        
+    Returns:
+        SLURM script content as string
+    """
+    combo_name = base_config.get_combination_name(combination)
+    job_name = f"plink_{combo_name}"
+    # Logs go next to the worker, i.e. the grid's slurm_logs directory
+    slurm_output_dir = os.path.dirname(worker_file)
+    
+    directives = [
+        f"--job-name={job_name}",
+        f"--output={os.path.join(slurm_output_dir, job_name + '.out')}",
+        f"--error={os.path.join(slurm_output_dir, job_name + '.err')}",
+    ]
+    
+    return render_job_script(
+        base_config, slurm_args, directives, worker_file, grid_config_file,
+        job_info=[f"Combination: {combo_name}"],
+        worker_args=[str(combination_id - 1)],
+        # One script per combination: point at the shared file rather than
+        # repeating the config in every job
+        embed_config=False,
+        workdir=workdir,
+        static_fields=static_fields
+    )
+
+
+class _SubmitRateLimiter:
+    """Spaces out calls so that at most `rate` happen per second."""
+    
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+    
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# sbatch errors that mean the controller is busy rather than the job is invalid
+_TRANSIENT_SBATCH_ERRORS = ("Socket timed out", "Slurmctld is not responding")
+
+
+def _submit_one(script_content: str, rate_limiter: _SubmitRateLimiter, retries: int = 3) -> str:
+    """Submit one script to sbatch on stdin and return its job ID.
     
-    os.chmod(script_file, 0o755)
-    return script_file
+    Transient controller errors are retried up to `retries` times with
+    exponential backoff (1s, 2s, 4s, ...).
+    """
+    for attempt in range(retries + 1):
+        rate_limiter.wait()
+        try:
+            result = subprocess.run(
+                ['sbatch', '--parsable'],
+                input=script_content,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            return result.stdout.strip().split(';')[0]
+        except subprocess.CalledProcessError as e:
+            transient = any(message in (e.stderr or '') for message in _TRANSIENT_SBATCH_ERRORS)
+            if not transient or attempt == retries:
+                raise
+            time.sleep(2 ** attempt)
 
 
 def submit_individual_jobs(
     grid_config: PLINKParameterGrid,
     slurm_args: Dict[str, Any],
     max_jobs: int = None,
-    dry_run: bool = False
+    dry_run: bool = False,
+    max_submit_rate: Optional[float] = 20.0,
+    submit_workers: int = 16,
+    submit_retries: int = 3
 ) -> List[str]:
     """
     Submit individual SLURM jobs for each parameter combination.
     
+    Submissions run concurrently on a small thread pool, throttled to
+    `max_submit_rate` sbatch calls per second so the controller is not flooded.
+    Submissions that fail because the controller is busy are retried.
+    
     Args:
         grid_config: Parameter grid configuration
         slurm_args: SLURM job arguments
         max_jobs: Maximum number of jobs to submit (None for all)
         dry_run: If True, create scripts but don't submit jobs
+        max_submit_rate: Maximum sbatch calls per second (None or 0 for unlimited)
+        submit_workers: Number of concurrent sbatch calls
+        submit_retries: Retries per job when the controller times out
         
     Returns:
-        List of job IDs (empty if dry_run=True)
+        List of job IDs in combination order (empty if dry_run=True)
     """
-    combinations = grid_config.get_parameter_combinations()
+    total_combinations = len(grid_config)
     
-    if max_jobs and max_jobs < len(combinations):
-        print(f"Limiting to first {max_jobs} combinations (out of {len(combinations)} total)")
-        combinations = combinations[:max_jobs]
+    if max_jobs and max_jobs < total_combinations:
+        print(f"Limiting to first {max_jobs} combinations (out of {total_combinations} total)")
+        # Only enumerate the combinations that will actually be submitted
+        combinations = list(islice(grid_config.iter_parameter_combinations(), max_jobs))
+    else:
+        combinations = grid_config.get_parameter_combinations()
     
     job_ids = []
     
+    # Resolve paths once so every script gets the same absolute locations.
+    # SLURM does not create log directories itself; the worker files live there too
+    workdir = os.getcwd()
+    slurm_output_dir = os.path.join(workdir, grid_config.grid_output_dir, "slurm_logs")
+    worker_file, grid_config_file = write_worker_files(grid_config, slurm_output_dir)
+    # Resources, PATH and interpreter are the same for every job of this submission
+    static_fields = _static_job_fields(slurm_args, workdir)
+    
     print(f"Creating SLURM jobs for {len(combinations)} combinations...")
     
-    for i, combination in enumerate(combinations, 1):
-        combo_name = grid_config.get_combination_name(combination)
-        
-        try:
-            # Create SLURM script
-            script_file = create_single_combination_script(
-                combination, i, grid_config, slurm_args
+    if dry_run:
+        for i, combination in enumerate(combinations, 1):
+            combo_name = grid_config.get_combination_name(combination)
+            script_content = create_single_combination_script(
+                combination, i, grid_config, slurm_args, worker_file, grid_config_file,
+                workdir, static_fields
+            )
+            # Write scripts only for inspection
+            script_file = os.path.join(slurm_output_dir, f"plink_{combo_name}.sh")
+            with open(script_file, 'w') as f:
+                f.write(script_content)
+            os.chmod(script_file, 0o755)
+            print(f"  {i:3d}. Created script: {os.path.basename(script_file)}")
+        return job_ids
+    
+    create_combination_dirs(grid_config, combinations)
+    rate_limiter = _SubmitRateLimiter(max_submit_rate)
+    
+    with ThreadPoolExecutor(max_workers=max(1, submit_workers)) as executor:
+        futures = []
+        for i, combination in enumerate(combinations, 1):
+            script_content = create_single_combination_script(
+                combination, i, grid_config, slurm_args, worker_file, grid_config_file,
+                workdir, static_fields
             )
-            
-            if dry_run:
-                print(f"  {i:3d}. Created script: {os.path.basename(script_file)}")
-            else:
-                # Submit job
-                result = subprocess.run(
-                    ['sbatch', script_file],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                
-                # Extract job ID
-                job_id = result.stdout.strip().split()[-1]
+            futures.append(executor.submit(_submit_one, script_content, rate_limiter, submit_retries))
+        
+        # Report in combination order
+        for i, (combination, future) in enumerate(zip(combinations, futures), 1):
+            combo_name = grid_config.get_combination_name(combination)
+            try:
+                job_id = future.result()
                 job_ids.append(job_id)
-                
                 print(f"  {i:3d}. Submitted job {job_id}: {combo_name}")
-                
-        except subprocess.CalledProcessError as e:
-            print(f"  {i:3d}. Error submitting {combo_name}: {e}")
-            print(f"       STDERR: {e.stderr}")
-        except Exception as e:
-            print(f"  {i:3d}. Unexpected error for {combo_name}: {e}")
+            except subprocess.CalledProcessError as e:
+                print(f"  {i:3d}. Error submitting {combo_name}: {e}")
+                print(f"       STDERR: {e.stderr}")
+            except Exception as e:
+                print(f"  {i:3d}. Unexpected error for {combo_name}: {e}")
     
     return job_ids
 
@@ -232,7 +498,9 @@ def submit_individual_jobs(
 def create_array_job_script(
     grid_config: PLINKParameterGrid,
     slurm_args: Dict[str, Any],
-    max_array_size: int = 1000
+    max_array_size: int = 1000,
+    batch_size: int = 1,
+    max_concurrent: Optional[int] = None
 ) -> str:
     """
     Create a SLURM array job script for parameter combinations.
@@ -241,172 +509,173 @@ def create_array_job_script(
         grid_config: Parameter grid configuration
         slurm_args: SLURM job arguments
         max_array_size: Maximum array size
+        batch_size: Number of consecutive combinations run by each array task
+        max_concurrent: Maximum number of tasks SLURM runs at once (None for no limit)
         
     Returns:
         Path to created array job script
     """
-    combinations = grid_config.get_parameter_combinations()
-    total_combinations = len(combinations)
-    
-    if total_combinations > max_array_size:
-        print(f"Warning: {total_combinations} combinations exceeds max array size {max_array_size}")
-        print(f"Consider using chunked jobs instead.")
-    
-    # Create combinations parameter file
-    slurm_output_dir = os.path.join(grid_config.grid_output_dir, "slurm_array")
-    os.makedirs(slurm_output_dir, exist_ok=True)
-    
-    combinations_file = os.path.join(slurm_output_dir, "combinations.json")
-    with open(combinations_file, 'w') as f:
-        json.dump(combinations, f, indent=2)
+    total_tasks = -(-len(grid_config) // batch_size)
+    
+    if total_tasks > max_array_size:
+        num_arrays = -(-total_tasks // max_array_size)
+        print(f"{total_tasks} array tasks exceed max array size {max_array_size}; "
+              f"will submit {num_arrays} array jobs")
+    
+    # Save the grid configuration and shared worker; each array task decodes
+    # its own combination from SLURM_ARRAY_TASK_ID, so no combination list is shipped
+    workdir = os.getcwd()
+    slurm_output_dir = os.path.join(workdir, grid_config.grid_output_dir, "slurm_array")
+    table_files = [os.path.join(slurm_output_dir, "combinations.parquet"),
+                   os.path.join(slurm_output_dir, "combinations.csv")]
+    
+    # Resubmitting the same grid (e.g. with other SLURM resources) can reuse
+    # the combination table written last time
+    table_is_current = False
+    try:
+        with open(os.path.join(slurm_output_dir, "grid_config.json"), 'r') as f:
+            table_is_current = (f.read() == grid_config_json(grid_config)
+                                and any(os.path.exists(p) for p in table_files))
+    except OSError:
+        pass
+    
+    worker_file, grid_config_file = write_worker_files(grid_config, slurm_output_dir)
+    
+    # Save the task ID -> combination mapping for reference; the row index
+    # is the SLURM_ARRAY_TASK_ID. Parquet needs pyarrow, so fall back to CSV.
+    if table_is_current:
+        print("Grid unchanged since last submission; reusing combination table")
+    else:
+        combinations_table = grid_config.get_combinations_dataframe()
+        combinations_table.index.name = 'task_id'
+        try:
+            combinations_table.to_parquet(table_files[0], compression='zstd')
+        except ImportError:
+            combinations_table.to_csv(table_files[1])
     
     # Create array job script
     array_script = os.path.join(slurm_output_dir, "array_job.sh")
+    throttle = f"%{max_concurrent}" if max_concurrent else ""
+    
+    directives = [
+        "--job-name=plink_array",
+        f"--output={slurm_output_dir}/plink_array_%A_%a.out",
+        f"--error={slurm_output_dir}/plink_array_%A_%a.err",
+        f"--array=0-{min(total_tasks, max_array_size) - 1}{throttle}",
+    ]
+    script_content = render_job_script(
+        grid_config, slurm_args, directives, worker_file, grid_config_file,
+        job_info_vars={'Array task ID': 'SLURM_ARRAY_TASK_ID'},
+        worker_env={'GRID_BATCH_SIZE': str(batch_size)},
+        workdir=workdir
+    )
     
-    # Prepare hom_odds_ratio value
-    hom_or_value = "'mult'" if grid_config.hom_odds_ratio == 'mult' else str(grid_config.hom_odds_ratio)
-    random_seed_value = str(grid_config.random_seed) if grid_config.random_seed else 'None'
+    with open(array_script, 'w') as f:
+        f.write(script_content)
     
-    # Build the Python script content separately to avoid f-string issues
-    python_script = f'''import json
-import sys
-from gensim import PLINKSimulationConfig, PLINKSimulationSet, PLINKSimulator
-
-# Load combinations
-with open('{combinations_file}', 'r') as f:
-    combinations = json.load(f)
-
-# Get combination for this array task (1-indexed)
-task_id = int('$SLURM_ARRAY_TASK_ID')
-if task_id > len(combinations):
-    print(f'Array task ID {{task_id}} exceeds number of combinations {{len(combinations)}}')
-    sys.exit(1)
+    os.chmod(array_script, 0o755)
+    return array_script
 
-combination = combinations[task_id - 1]  # Convert to 0-indexed
-
-# Create combination name  
-base_prefix = '{grid_config.base_prefix}'
-combo_name = f'{{base_prefix}}_n{{combination["cohort_size"]}}_prev{{combination["prevalence"]:.3f}}_snps{{combination["total_snps"]}}_causal{{combination["causal_snps"]}}'
-combo_dir = '{grid_config.grid_output_dir}/' + combo_name
-
-print(f'Processing combination {{task_id}}: {{combo_name}}')
-print(f'  Cohort: {{combination["cohort_size"]}} ({{combination["num_cases"]}} cases, {{combination["num_controls"]}} controls)')
-print(f'  Prevalence: {{combination["prevalence"]:.3f}}')
-print(f'  SNPs: {{combination["total_snps"]}} ({{combination["causal_snps"]}} causal)')
-
-# Create SNP sets
-snp_sets = [
-    PLINKSimulationSet(
-        num_snps=combination['null_snps'],
-        label='null',
-        min_freq={grid_config.min_freq},
-        max_freq={grid_config.max_freq},
-        het_odds_ratio=1.0,
-        hom_odds_ratio=1.0
-    )
-]
 
-if combination['causal_snps'] > 0:
-    snp_sets.append(
-        PLINKSimulationSet(
-            num_snps=combination['causal_snps'],
-            label='causal',
-            min_freq={grid_config.min_freq},
-            max_freq={grid_config.max_freq},
-            het_odds_ratio={grid_config.het_odds_ratio},
-            hom_odds_ratio={hom_or_value}
+@functools.lru_cache(maxsize=1)
+def get_max_array_size() -> Optional[int]:
+    """
+    Query the cluster's MaxArraySize from scontrol.
+    
+    Returns:
+        Maximum number of tasks per array job, or None if unavailable
+    """
+    try:
+        result = subprocess.run(
+            ['scontrol', 'show', 'config'],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=10
         )
-    )
-
-# Create configuration
-config = PLINKSimulationConfig(
-    output_prefix=combo_name,
-    output_dir=combo_dir,
-    num_cases=combination['num_cases'],
-    num_controls=combination['num_controls'],
-    disease_prevalence=combination['prevalence'],
-    snp_sets=snp_sets,
-    plink_executable='{grid_config.plink_executable}',
-    random_seed={random_seed_value}
-)
-
-# Run simulation
-simulator = PLINKSimulator(config)
-result = simulator.run_simulation()
-
-if result['success']:
-    print('✓ Simulation completed successfully!')
-else:
-    print('✗ Simulation failed!')
-    print(f'Error: {{result.get("error", "Unknown error")}}')
-    sys.exit(1)'''
-
-    script_content = f"""#!/bin/bash
-
-#SBATCH --job-name=plink_array
-#SBATCH --output={slurm_output_dir}/plink_array_%A_%a.out
-#SBATCH --error={slurm_output_dir}/plink_array_%A_%a.err
-#SBATCH --time={slurm_args.get('time', '01:00:00')}
-#SBATCH --mem-per-cpu={slurm_args.get('memory', '2G')}
-#SBATCH --cpus-per-task={slurm_args.get('cpus', 1)}
-#SBATCH --partition={slurm_args.get('partition', 'cpu')}
-#SBATCH --array=1-{min(total_combinations, max_array_size)}"""
-
-    if slurm_args.get('account'):
-        script_content += f"\n#SBATCH --account={slurm_args['account']}"
-
-    script_content += f"""
-
-# Load modules and activate mamba environment
-# module load mamba  # Uncomment if needed on your cluster
-source ~/.bashrc
-mamba activate gensim
-
-# Set working directory
-cd {os.getcwd()}
-
-# Print job information
-echo "Array job started at: $(date)"
-echo "Job ID: $SLURM_JOB_ID"
-echo "Array task ID: $SLURM_ARRAY_TASK_ID"
-echo "Node: $SLURM_NODELIST"
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+    
+    match = re.search(r'^MaxArraySize\s*=\s*(\d+)', result.stdout, re.MULTILINE)
+    return int(match.group(1)) if match else None
 
-# Run combination for this array index
-python -c "{python_script}"
 
-echo "Array task finished at: $(date)"
-"""
+def submit_array_jobs(
+    array_script: str,
+    total_combinations: int,
+    max_array_size: int,
+    batch_size: int = 1,
+    max_concurrent: Optional[int] = None
+) -> List[str]:
+    """
+    Submit an array job script, splitting the grid over several arrays if needed.
     
-    with open(array_script, 'w') as f:
-        f.write(script_content)
+    Each array covers at most max_array_size tasks; its tasks receive the
+    index of their first task in GRID_TASK_OFFSET.
     
-    os.chmod(array_script, 0o755)
-    return array_script
+    Args:
+        array_script: Path to array job script
+        total_combinations: Number of combinations in the grid
+        max_array_size: Maximum number of tasks per array job
+        batch_size: Number of combinations run by each array task
+        max_concurrent: Maximum number of running tasks per array job (None for no limit)
+        
+    Returns:
+        List of array job IDs
+    """
+    job_ids = []
+    total_tasks = -(-total_combinations // batch_size)
+    throttle = f"%{max_concurrent}" if max_concurrent else ""
+    
+    for offset in range(0, total_tasks, max_array_size):
+        num_tasks = min(max_array_size, total_tasks - offset)
+        result = subprocess.run(
+            ['sbatch', '--parsable', f'--array=0-{num_tasks - 1}{throttle}',
+             f'--export=ALL,GRID_TASK_OFFSET={offset}', array_script],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        job_id = result.stdout.strip().split(';')[0]
+        job_ids.append(job_id)
+        first = offset * batch_size + 1
+        last = min((offset + num_tasks) * batch_size, total_combinations)
+        print(f"Submitted array job {job_id}: combinations {first}-{last}")
+    
+    return job_ids
 
 
-def main():
-    """Main function."""
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Main function.
+    
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+        
+    Returns:
+        Process exit status
+    """
     parser = argparse.ArgumentParser(
         description="Submit individual parameter combinations as SLURM jobs",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
-  # Submit each combination as separate job
+  # Submit all combinations as one SLURM array job (default)
   python submit_individual_slurm.py \\
-    --cohort-sizes "500,1000" --prevalences "0.01,0.05" \\
-    --total-snps "5000,10000" --causal-snps "50,100"
+    --cohort-sizes "500,1000,2000" --prevalences "0.01,0.05,0.1" \\
+    --total-snps "5000,10000,20000" --causal-snps "50,100,200"
   
-  # Use array job for many combinations
+  # Submit each combination as separate job (deprecated)
   python submit_individual_slurm.py \\
-    --cohort-sizes "500,1000,2000" --prevalences "0.01,0.05,0.1" \\
-    --total-snps "5000,10000,20000" --causal-snps "50,100,200" \\
-    --use-array
+    --cohort-sizes "500,1000" --prevalences "0.01,0.05" \\
+    --total-snps "5000,10000" --causal-snps "50,100" \\
+    --individual-jobs
   
-  # Limit number of jobs
+  # Limit number of individual jobs
   python submit_individual_slurm.py \\
     --cohort-sizes "500,1000,2000,5000" --prevalences "0.01,0.05,0.1,0.2" \\
     --total-snps "5000,10000,20000,50000" --causal-snps "50,100,200,500" \\
-    --max-jobs 50
+    --individual-jobs --max-jobs 50
         """
     )
     
@@ -454,15 +723,34 @@ Examples:
     
     # Job control
     parser.add_argument("--max-jobs", type=int,
-                       help="Maximum number of jobs to submit")
+                       help="Maximum number of individual jobs to submit")
+    parser.add_argument("--max-submit-rate", type=float, default=20.0,
+                       help="Maximum sbatch submissions per second for individual jobs (default: 20, 0 for unlimited)")
+    parser.add_argument("--submit-retries", type=int, default=3,
+                       help="Retries per individual job when sbatch times out (default: 3)")
+    parser.add_argument("--individual-jobs", action="store_true",
+                       help="Submit one sbatch job per combination instead of an array job (deprecated)")
     parser.add_argument("--use-array", action="store_true",
-                       help="Use SLURM array job instead of individual jobs")
-    parser.add_argument("--max-array-size", type=int, default=1000,
-                       help="Maximum array size for array jobs")
+                       help="Use SLURM array job (default; kept for compatibility)")
+    parser.add_argument("--max-array-size", type=int,
+                       help="Maximum array size for array jobs (default: cluster MaxArraySize or 1000)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                       help="Combinations run sequentially per array task (default: 1); scale --time to match")
+    parser.add_argument("--max-concurrent", type=int,
+                       help="Maximum array tasks running at once (appends %%K to --array). "
+                            "Lower values spare shared filesystems and fairshare at the cost of "
+                            "longer total runtime (default: no limit)")
     parser.add_argument("--dry-run", action="store_true",
                        help="Create scripts but don't submit")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    if args.max_concurrent is not None and args.max_concurrent < 1:
+        parser.error("--max-concurrent must be at least 1")
+    if args.submit_retries < 0:
+        parser.error("--submit-retries must not be negative")
     
     # Parse parameters
     def parse_int_list(value_str):
@@ -494,7 +782,7 @@ Examples:
         print(f"Error creating grid configuration: {e}")
         return 1
     
-    total_combinations = len(grid_config.get_parameter_combinations())
+    total_combinations = len(grid_config)
     print(f"Total parameter combinations: {total_combinations}")
     
     slurm_args = {
@@ -505,29 +793,34 @@ Examples:
         'account': args.account
     }
     
-    if args.use_array:
+    if args.individual_jobs:
+        # Submit individual jobs
+        print("Note: per-combination submission is deprecated; array jobs are the default")
+        job_ids = submit_individual_jobs(grid_config, slurm_args, args.max_jobs, args.dry_run,
+                                         max_submit_rate=args.max_submit_rate,
+                                         submit_retries=args.submit_retries)
+        
+        if job_ids:
+            print(f"\\nSubmitted {len(job_ids)} individual jobs")
+            print(f"Monitor with: squeue -u $USER")
+    else:
         # Create array job
+        max_array_size = args.max_array_size or get_max_array_size() or 1000
         print(f"Creating SLURM array job...")
-        array_script = create_array_job_script(grid_config, slurm_args, args.max_array_size)
+        array_script = create_array_job_script(grid_config, slurm_args, max_array_size,
+                                               args.batch_size, args.max_concurrent)
         
         if args.dry_run:
             print(f"Array job script created: {array_script}")
         else:
             try:
-                result = subprocess.run(['sbatch', array_script], capture_output=True, text=True, check=True)
-                job_id = result.stdout.strip().split()[-1]
-                print(f"Submitted array job: {job_id}")
-                print(f"Monitor with: squeue -j {job_id}")
+                create_combination_dirs(grid_config, grid_config.iter_parameter_combinations())
+                job_ids = submit_array_jobs(array_script, total_combinations, max_array_size,
+                                            args.batch_size, args.max_concurrent)
+                print(f"Monitor with: squeue -j {','.join(job_ids)}")
             except subprocess.CalledProcessError as e:
                 print(f"Error submitting array job: {e}")
                 return 1
-    else:
-        # Submit individual jobs
-        job_ids = submit_individual_jobs(grid_config, slurm_args, args.max_jobs, args.dry_run)
-        
-        if job_ids:
-            print(f"\\nSubmitted {len(job_ids)} individual jobs")
-            print(f"Monitor with: squeue -u $USER")
     
     return 0
 
@@ -2,50 +2,134 @@
 """
 SLURM job submission script for parallel parameter grid simulation.
 
-This script splits a parameter grid into chunks and submits SLURM jobs
-to run each chunk in parallel across the cluster.
+This script splits a parameter grid into chunks and submits them as one
+SLURM array job, with one array task per chunk.
 """
 
 import os
 import sys
 import argparse
 import json
+import shlex
 import subprocess
-import math
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
 
 from gensim import PLINKParameterGrid
 
 
-def create_slurm_script(
+# Driver run by every chunk task, written once as run_chunk.py next to the
+# chunk parameter files
+CHUNK_DRIVER_SCRIPT = """\
+import json
+import os
+import sys
+
+# Jobs cd to the submission directory; make gensim importable from there
+sys.path.insert(0, os.getcwd())
+from gensim import PLINKParameterGrid, PLINKParameterGridSimulator
+
+
+def main(param_file):
+    with open(param_file, 'r') as f:
+        chunk = json.load(f)
+    grid_config = PLINKParameterGrid(**chunk['grid_config'])
+    simulator = PLINKParameterGridSimulator(grid_config)
+    results = simulator.run_parameter_grid(start=chunk['start'], end=chunk['end'])
+    print(f"Chunk results: {results['successful']}/{results['total_combinations']} successful")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1])
+"""
+
+
+# Aggregates the per-combination markers printed by run_parameter_grid
+# from all task logs; written next to the monitor script
+COLLECT_RESULTS_SCRIPT = """\
+import glob
+import mmap
+import os
+import re
+import sys
+
+SUCCESS_MARKER = '✓ Success'.encode()
+FAILURE_MARKER = '✗ Failed'.encode()
+RESULT_PATTERN = re.compile(b'^  (' + SUCCESS_MARKER + b'|' + FAILURE_MARKER + b'):', re.MULTILINE)
+
+
+def count_results(output_file):
+    with open(output_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0, 0
+        successful = failed = 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for match in RESULT_PATTERN.finditer(data):
+                if match.group(1) == SUCCESS_MARKER:
+                    successful += 1
+                else:
+                    failed += 1
+    return successful, failed
+
+
+def main(grid_dir):
+    print('Collecting results from SLURM job outputs...')
+    
+    total_successful = 0
+    total_failed = 0
+    for output_file in sorted(glob.glob(os.path.join(grid_dir, 'slurm_jobs', 'plink_grid_array_*.out'))):
+        print('Checking results in: {}'.format(os.path.basename(output_file)))
+        successful, failed = count_results(output_file)
+        if successful + failed > 0:
+            print('  Combinations: {}, Successful: {}, Failed: {}'.format(
+                successful + failed, successful, failed))
+            total_successful += successful
+            total_failed += failed
+    total_combinations = total_successful + total_failed
+    
+    # Also count actual dataset directories created
+    dataset_count = sum(1 for entry in os.scandir(grid_dir)
+                        if entry.is_dir() and entry.name.startswith('dataset_'))
+    
+    print()
+    print('OVERALL RESULTS:')
+    print('Total combinations processed: {}'.format(total_combinations))
+    print('Successful simulations: {}'.format(total_successful))
+    print('Failed simulations: {}'.format(total_failed))
+    print('Dataset directories created: {}'.format(dataset_count))
+    if total_combinations > 0:
+        print('Success rate: {:.1f}%'.format(total_successful * 100 / total_combinations))
+    print()
+    print('Generated datasets are in: {}/dataset_*/'.format(grid_dir))
+    print('SLURM job outputs in: {}/slurm_jobs/'.format(grid_dir))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1])
+"""
+
+
+def _write_executable(path: str, content: str) -> None:
+    """Write a script created executable, without a separate chmod."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+
+
+def _build_slurm_header(
     job_name: str,
     output_file: str,
     error_file: str,
-    time_limit: str = "02:00:00",
-    memory: str = "4G",
-    cpus: int = 1,
-    partition: str = "cpu",
-    account: str = None,
-    commands: List[str] = None
+    time_limit: str,
+    memory: str,
+    cpus: int,
+    partition: str,
+    account: str
 ) -> str:
-    """
-    Create a SLURM job script.
-    
-    Args:
-        job_name: Name of the SLURM job
-        output_file: Path for stdout output
-        error_file: Path for stderr output
-        time_limit: Job time limit (HH:MM:SS format)
-        memory: Memory requirement
-        cpus: Number of CPUs
-        partition: SLURM partition
-        account: SLURM account (optional)
-        commands: List of commands to execute
-        
-    Returns:
-        SLURM script content as string
-    """
+    """Build the #SBATCH block and environment setup shared by job scripts."""
     script_lines = [
         "#!/bin/bash",
         "",
@@ -63,13 +147,12 @@ def create_slurm_script(
     
     script_lines.extend([
         "",
-        "# Load modules and activate mamba environment",
-        "# module load mamba  # Uncomment if needed on your cluster",
-        "source ~/.bashrc",
-        "mamba activate gensim",
+        "# Reuse the submitting environment instead of initializing mamba in every job",
+        f"export PATH={shlex.quote(os.environ.get('PATH', ''))}",
+        f"PYTHON={shlex.quote(sys.executable)}",
         "",
-        "# Set working directory",
-        f"cd {os.getcwd()}",
+        "# Run from the directory the job was submitted from",
+        "cd \"$SLURM_SUBMIT_DIR\"",
         "",
         "# Print job information",
         "echo \"Job started at: $(date)\"",
@@ -80,99 +163,148 @@ def create_slurm_script(
         "# Run commands",
     ])
     
-    if commands:
-        script_lines.extend(commands)
+    return "\n".join(script_lines)
+
+
+def create_slurm_script(
+    job_name: str,
+    output_file: str,
+    error_file: str,
+    time_limit: str = "02:00:00",
+    memory: str = "4G",
+    cpus: int = 1,
+    partition: str = "cpu",
+    account: str = None,
+    commands: List[str] = None
+) -> str:
+    """
+    Create a SLURM job script.
     
-    script_lines.extend([
-        "",
-        "echo \"Job finished at: $(date)\"",
-    ])
+    Args:
+        job_name: Name of the SLURM job
+        output_file: Path for stdout output
+        error_file: Path for stderr output
+        time_limit: Job time limit (HH:MM:SS format)
+        memory: Memory requirement
+        cpus: Number of CPUs
+        partition: SLURM partition
+        account: SLURM account (optional)
+        commands: List of commands to execute
+        
+    Returns:
+        SLURM script content as string
+    """
+    header = _build_slurm_header(
+        job_name, output_file, error_file, time_limit, memory, cpus, partition, account
+    )
+    body = "\n".join((commands or []) + ["", "echo \"Job finished at: $(date)\""])
+    return f"{header}\n{body}\n"
+
+
+def estimate_combination_costs(grid_config: PLINKParameterGrid) -> np.ndarray:
+    """
+    Estimate the relative run time of every combination, in grid order.
     
-    return "\n".join(script_lines)
+    PLINK simulation time grows roughly with cohort_size * total_snps.
+    
+    Args:
+        grid_config: Parameter grid configuration
+        
+    Returns:
+        Array of length len(grid_config) with one cost per combination
+    """
+    cohort_sizes = np.asarray(grid_config.cohort_sizes, dtype=np.float64)
+    total_snps = np.asarray(grid_config.total_snps, dtype=np.float64)
+    shape = (len(grid_config.cohort_sizes), len(grid_config.prevalences),
+             len(grid_config.total_snps), len(grid_config.causal_snps))
+    costs = cohort_sizes[:, None, None, None] * total_snps[None, None, :, None]
+    return np.broadcast_to(costs, shape).ravel()
 
 
 def split_parameter_combinations(
     grid_config: PLINKParameterGrid,
-    num_chunks: int
-) -> List[Tuple[int, int, List[Dict[str, Any]]]]:
+    num_chunks: int,
+    balance_cost: bool = False
+) -> List[Tuple[int, int]]:
     """
-    Split parameter combinations into chunks for parallel processing.
+    Split parameter combinations into contiguous index ranges for parallel processing.
+    
+    Only the range boundaries are computed; combinations are decoded from
+    their index by each chunk at run time. By default chunks hold equal
+    numbers of combinations; with balance_cost they hold roughly equal
+    estimated run time (see estimate_combination_costs).
     
     Args:
         grid_config: Parameter grid configuration
         num_chunks: Number of chunks to create
+        balance_cost: Split by cumulative estimated cost instead of by count
         
     Returns:
-        List of tuples: (start_idx, end_idx, combinations_chunk)
+        List of tuples: (start_idx, end_idx) with end_idx exclusive
     """
-    combinations = grid_config.get_parameter_combinations()
-    total_combinations = len(combinations)
+    total_combinations = len(grid_config)
     
     if num_chunks > total_combinations:
-        num_chunks = total_combinations
         print(f"Warning: More chunks ({num_chunks}) than combinations ({total_combinations}). "
               f"Reducing to {total_combinations} chunks.")
+        num_chunks = total_combinations
     
-    chunk_size = math.ceil(total_combinations / num_chunks)
-    chunks = []
-    
-    for i in range(num_chunks):
-        start_idx = i * chunk_size
-        end_idx = min((i + 1) * chunk_size, total_combinations)
-        
-        if start_idx >= total_combinations:
-            break
-            
-        chunk_combinations = combinations[start_idx:end_idx]
-        chunks.append((start_idx, end_idx - 1, chunk_combinations))
-    
-    return chunks
+    if balance_cost:
+        # Cut where the running cost crosses each 1/num_chunks share, keeping
+        # ranges contiguous so chunks still run with start/end indices
+        cumulative = np.concatenate([[0.0], np.cumsum(estimate_combination_costs(grid_config))])
+        targets = cumulative[-1] * np.arange(1, num_chunks) / num_chunks
+        # Take whichever boundary around each target lands closer to it
+        above = np.searchsorted(cumulative, targets)
+        below = above - 1
+        closer_below = (targets - cumulative[below]) < (cumulative[above] - targets)
+        cuts = np.where(closer_below, below, above).tolist()
+        bounds = [0] + cuts + [total_combinations]
+        # Every chunk must hold at least one combination
+        for i in range(1, num_chunks):
+            bounds[i] = min(max(bounds[i], bounds[i - 1] + 1),
+                            total_combinations - (num_chunks - i))
+    else:
+        # Sizes differ by at most one: the first `remainder` chunks get one extra
+        chunk_size, remainder = divmod(total_combinations, num_chunks)
+        bounds = [i * chunk_size + min(i, remainder) for i in range(num_chunks + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(num_chunks)]
 
 
 def create_chunk_parameter_file(
-    chunk_combinations: List[Dict[str, Any]],
+    chunk_range: Tuple[int, int],
     chunk_id: int,
     base_grid_config: PLINKParameterGrid,
-    output_dir: str
+    output_dir: str,
+    estimated_cost: float = None
 ) -> str:
     """
     Create a parameter file for a specific chunk.
     
     Args:
-        chunk_combinations: Parameter combinations for this chunk
+        chunk_range: (start_idx, end_idx) combination range for this chunk
         chunk_id: Chunk identifier
         base_grid_config: Base grid configuration
         output_dir: Output directory for chunk files
+        estimated_cost: Share of the grid's estimated cost in this chunk,
+            stored for diagnostics (optional)
         
     Returns:
         Path to created parameter file
     """
-    # Extract unique values for each parameter from the chunk
-    cohort_sizes = sorted(list(set(combo['cohort_size'] for combo in chunk_combinations)))
-    prevalences = sorted(list(set(combo['prevalence'] for combo in chunk_combinations)))
-    total_snps = sorted(list(set(combo['total_snps'] for combo in chunk_combinations)))
-    causal_snps = sorted(list(set(combo['causal_snps'] for combo in chunk_combinations)))
-    
+    start_idx, end_idx = chunk_range
     chunk_config = {
-        'cohort_sizes': cohort_sizes,
-        'prevalences': prevalences,
-        'total_snps': total_snps,
-        'causal_snps': causal_snps,
-        'grid_output_dir': base_grid_config.grid_output_dir,  # No chunk subdirectory
-        'base_prefix': base_grid_config.base_prefix,  # Keep original prefix
-        'case_control_ratio': base_grid_config.case_control_ratio,
-        'min_freq': base_grid_config.min_freq,
-        'max_freq': base_grid_config.max_freq,
-        'het_odds_ratio': base_grid_config.het_odds_ratio,
-        'hom_odds_ratio': base_grid_config.hom_odds_ratio,
-        'plink_executable': base_grid_config.plink_executable,
-        'random_seed': base_grid_config.random_seed
+        'grid_config': base_grid_config.get_config_dict(),
+        'start': start_idx,
+        'end': end_idx
     }
+    if estimated_cost is not None:
+        chunk_config['estimated_cost'] = estimated_cost
     
     chunk_param_file = os.path.join(output_dir, f"chunk_{chunk_id}_params.json")
     
     with open(chunk_param_file, 'w') as f:
-        json.dump(chunk_config, f, indent=2)
+        f.write(json.dumps(chunk_config, separators=(',', ':')))
     
     return chunk_param_file
 
@@ -181,221 +313,204 @@ def submit_slurm_jobs(
     grid_config: PLINKParameterGrid,
     num_jobs: int,
     slurm_args: Dict[str, Any],
-    dry_run: bool = False
+    dry_run: bool = False,
+    balance_cost: bool = False
 ) -> List[str]:
     """
     Submit SLURM jobs for parameter grid simulation.
     
+    All chunks are submitted as tasks of a single SLURM array job.
+    
     Args:
         grid_config: Parameter grid configuration
         num_jobs: Number of parallel jobs to submit
         slurm_args: SLURM job arguments
         dry_run: If True, create scripts but don't submit jobs
+        balance_cost: Balance chunks by estimated run time instead of count
         
     Returns:
-        List of job IDs (empty if dry_run=True)
+        List of array task IDs as <jobid>_<task> (empty if dry_run=True)
     """
     # Create output directories
     slurm_output_dir = os.path.join(grid_config.grid_output_dir, "slurm_jobs")
     os.makedirs(slurm_output_dir, exist_ok=True)
     
     # Split combinations into chunks
-    chunks = split_parameter_combinations(grid_config, num_jobs)
+    chunks = split_parameter_combinations(grid_config, num_jobs, balance_cost)
+    
+    # Fraction of the total estimated cost per chunk
+    cumulative = np.concatenate([[0.0], np.cumsum(estimate_combination_costs(grid_config))])
+    cost_shares = [(cumulative[end_idx] - cumulative[start_idx]) / cumulative[-1]
+                   for start_idx, end_idx in chunks]
+    
+    print(f"Splitting {len(grid_config)} combinations into {len(chunks)} chunks:")
+    for i, ((start_idx, end_idx), share) in enumerate(zip(chunks, cost_shares)):
+        print(f"  Chunk {i+1}: combinations {start_idx+1}-{end_idx} ({end_idx - start_idx} combinations, "
+              f"{share:.1%} of estimated cost)")
+    
+    # Write one parameter file per chunk; array task i reads chunk_i_params.json.
+    # The writes are latency-bound on shared filesystems, so overlap them.
+    with ThreadPoolExecutor(max_workers=min(32, len(chunks))) as executor:
+        list(executor.map(
+            lambda item: create_chunk_parameter_file(
+                item[1][0], item[0], grid_config, slurm_output_dir,
+                estimated_cost=round(item[1][1], 6)
+            ),
+            enumerate(zip(chunks, cost_shares), 1)
+        ))
+    
+    # One array job covers all chunks, so the controller sees a single submission
+    job_name = "plink_grid_array"
+    output_file = os.path.join(slurm_output_dir, f"{job_name}_%A_%a.out")
+    error_file = os.path.join(slurm_output_dir, f"{job_name}_%A_%a.err")
+    
+    # Write the chunk driver once; the job script only passes it a parameter file
+    driver_file = os.path.join(slurm_output_dir, "run_chunk.py")
+    with open(driver_file, 'w') as f:
+        f.write(CHUNK_DRIVER_SCRIPT)
+    
+    # Build command to run the chunk of this array task
+    chunk_commands = [
+        f"PARAM_FILE={shlex.quote(slurm_output_dir)}/chunk_${{SLURM_ARRAY_TASK_ID}}_params.json",
+        "echo \"Processing chunk $SLURM_ARRAY_TASK_ID from $PARAM_FILE\"",
+        "",
+        f"\"$PYTHON\" {shlex.quote(driver_file)} \"$PARAM_FILE\""
+    ]
     
-    print(f"Splitting {len(grid_config.get_parameter_combinations())} combinations into {len(chunks)} chunks:")
-    for i, (start_idx, end_idx, chunk_combos) in enumerate(chunks):
-        print(f"  Chunk {i+1}: combinations {start_idx+1}-{end_idx+1} ({len(chunk_combos)} combinations)")
+    slurm_script_content = create_slurm_script(
+        job_name=job_name,
+        output_file=output_file,
+        error_file=error_file,
+        time_limit=slurm_args.get('time', '02:00:00'),
+        memory=slurm_args.get('memory', '4G'),
+        cpus=slurm_args.get('cpus', 1),
+        partition=slurm_args.get('partition', 'cpu'),
+        account=slurm_args.get('account'),
+        commands=chunk_commands
+    )
     
-    job_ids = []
+    # Write executable SLURM script
+    script_file = os.path.join(slurm_output_dir, f"{job_name}.sh")
+    _write_executable(script_file, slurm_script_content)
     
-    for chunk_id, (start_idx, end_idx, chunk_combinations) in enumerate(chunks):
-        # Create parameter file for this chunk
-        chunk_param_file = create_chunk_parameter_file(
-            chunk_combinations, chunk_id + 1, grid_config, slurm_output_dir
-        )
-        
-        # Create SLURM script
-        job_name = f"plink_grid_chunk_{chunk_id + 1}"
-        output_file = os.path.join(slurm_output_dir, f"{job_name}.out")
-        error_file = os.path.join(slurm_output_dir, f"{job_name}.err")
-        
-        # Build command to run the chunk
-        chunk_commands = [
-            f"echo \"Processing chunk {chunk_id + 1} with {len(chunk_combinations)} combinations\"",
-            "",
-            "# Run parameter grid for this chunk",
-            f"python -c \"",
-            "import json",
-            "from gensim import PLINKParameterGrid, PLINKParameterGridSimulator",
-            f"with open('{chunk_param_file}', 'r') as f:",
-            "    config_dict = json.load(f)",
-            "config_dict['hom_odds_ratio'] = config_dict['hom_odds_ratio'] if config_dict['hom_odds_ratio'] == 'mult' else float(config_dict['hom_odds_ratio'])",
-            "grid_config = PLINKParameterGrid(**config_dict)",
-            "simulator = PLINKParameterGridSimulator(grid_config)",
-            "results = simulator.run_parameter_grid()",
-            "print(f'Chunk results: {results[\\\"successful\\\"]}/{results[\\\"total_combinations\\\"]} successful')",
-            "\""
-        ]
-        
-        slurm_script_content = create_slurm_script(
-            job_name=job_name,
-            output_file=output_file,
-            error_file=error_file,
-            time_limit=slurm_args.get('time', '02:00:00'),
-            memory=slurm_args.get('memory', '4G'),
-            cpus=slurm_args.get('cpus', 1),
-            partition=slurm_args.get('partition', 'cpu'),
-            account=slurm_args.get('account'),
-            commands=chunk_commands
-        )
-        
-        # Write SLURM script
-        script_file = os.path.join(slurm_output_dir, f"{job_name}.sh")
-        with open(script_file, 'w') as f:
-            f.write(slurm_script_content)
-        
-        # Make script executable
-        os.chmod(script_file, 0o755)
-        
-        if dry_run:
-            print(f"Created SLURM script: {script_file}")
-        else:
-            # Submit job
-            try:
-                result = subprocess.run(
-                    ['sbatch', script_file],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                
-                # Extract job ID from sbatch output
-                job_id = result.stdout.strip().split()[-1]
-                job_ids.append(job_id)
-                
-                print(f"Submitted job {job_id}: {job_name}")
-                
-            except subprocess.CalledProcessError as e:
-                print(f"Error submitting job {job_name}: {e}")
-                print(f"STDERR: {e.stderr}")
-    
-    return job_ids
-
-
-def create_monitor_script(grid_output_dir: str, job_ids: List[str]) -> str:
+    if dry_run:
+        print(f"Created SLURM array script: {script_file}")
+        return []
+    
+    # Submit all chunks as one array job
+    result = subprocess.run(
+        ['sbatch', '--parsable', f'--array=1-{len(chunks)}', script_file],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    
+    # Extract job ID from sbatch output
+    array_job_id = result.stdout.strip().split(';')[0]
+    print(f"Submitted array job {array_job_id}: {job_name} ({len(chunks)} tasks)")
+    
+    return [f"{array_job_id}_{i}" for i in range(1, len(chunks) + 1)]
+
+
+def create_monitor_script(
+    grid_output_dir: str,
+    job_ids: List[str],
+    slurm_args: Dict[str, Any] = None
+) -> str:
     """
-    Create a monitoring script to check job status and collect results.
+    Create a monitoring script to wait for the jobs and collect results.
+    
+    The script blocks on `sbatch --wait` for a no-op job that depends on the
+    whole array, then classifies the tasks with a single sacct call. The
+    wait job needs its own allocation, so on a busy partition it can start
+    some time after the array has finished. If the wait job is rejected or
+    fails, the script falls back to polling the array's state with sacct.
     
     Args:
         grid_output_dir: Grid output directory
-        job_ids: List of submitted job IDs
+        job_ids: List of submitted array task IDs (<jobid>_<task>)
+        slurm_args: SLURM job arguments; partition and account are reused
+            for the no-op wait job
         
     Returns:
         Path to monitoring script
     """
     monitor_script = os.path.join(grid_output_dir, "monitor_jobs.sh")
+    array_job_id = job_ids[0].split('_')[0]
+    
+    wait_options = "--job-name=plink_grid_wait --time=00:01:00 --output=/dev/null"
+    if slurm_args and slurm_args.get('partition'):
+        wait_options += f" --partition={shlex.quote(slurm_args['partition'])}"
+    if slurm_args and slurm_args.get('account'):
+        wait_options += f" --account={shlex.quote(slurm_args['account'])}"
     
     script_content = f"""#!/bin/bash
 
 # Monitor SLURM jobs for parameter grid simulation
-JOB_IDS=({' '.join(job_ids)})
-GRID_DIR="{grid_output_dir}"
+ARRAY_JOB_ID={array_job_id}
+GRID_DIR={shlex.quote(grid_output_dir)}
 
-echo "Monitoring {len(job_ids)} SLURM jobs..."
-echo "Job IDs: {' '.join(job_ids)}"
+echo "Monitoring array job $ARRAY_JOB_ID ({len(job_ids)} tasks)..."
 echo ""
 
 # Function to check job status
 check_jobs() {{
-    echo "Checking job status at $(date):"
-    for job_id in "${{JOB_IDS[@]}}"; do
-        status=$(squeue -j $job_id -h -o "%T" 2>/dev/null || echo "COMPLETED/FAILED")
-        echo "  Job $job_id: $status"
-    done
+    echo "Job status at $(date):"
+    sacct -j $ARRAY_JOB_ID -X -n -o JobID,State
     echo ""
 }}
 
 # Function to collect results
 collect_results() {{
-    echo "Collecting results from SLURM job outputs..."
-    
-    total_combinations=0
-    total_successful=0
-    total_failed=0
-    
-    # Check each SLURM job output file for results
-    for output_file in "$GRID_DIR"/slurm_jobs/plink_grid_chunk_*.out; do
-        if [ -f "$output_file" ]; then
-            echo "Checking results in: $(basename $output_file)"
-            
-            # Count successful and failed combinations from output
-            successful_count=$(grep -c "✓ Simulation completed successfully!" "$output_file" 2>/dev/null || echo "0")
-            failed_count=$(grep -c "✗ Simulation failed!" "$output_file" 2>/dev/null || echo "0")
-            chunk_total=$((successful_count + failed_count))
-            
-            if [ $chunk_total -gt 0 ]; then
-                echo "  Combinations: $chunk_total, Successful: $successful_count, Failed: $failed_count"
-                total_combinations=$((total_combinations + chunk_total))
-                total_successful=$((total_successful + successful_count))
-                total_failed=$((total_failed + failed_count))
-            fi
+    {shlex.quote(sys.executable)} "$GRID_DIR/collect_results.py" "$GRID_DIR"
+}}
+
+# Poll sacct until no array task is pending or running
+wait_with_sacct() {{
+    while true; do
+        if states=$(sacct -j $ARRAY_JOB_ID -X -n -o State 2>/dev/null) && \\
+           ! grep -qE 'PENDING|RUNNING|REQUEUED|SUSPENDED|CONFIGURING|COMPLETING|RESIZING' <<< "$states"; then
+            return
         fi
+        sleep 60
     done
-    
-    # Also count actual dataset directories created
-    dataset_count=$(find "$GRID_DIR" -maxdepth 1 -name "dataset_*" -type d | wc -l)
-    
-    echo ""
-    echo "OVERALL RESULTS:"
-    echo "Total combinations processed: $total_combinations"
-    echo "Successful simulations: $total_successful"
-    echo "Failed simulations: $total_failed"
-    echo "Dataset directories created: $dataset_count"
-    if [ $total_combinations -gt 0 ]; then
-        echo "Success rate: $(echo "scale=1; $total_successful * 100 / $total_combinations" | bc -l 2>/dev/null || echo "N/A")%"
-    fi
-    echo ""
-    echo "Generated datasets are in: $GRID_DIR/dataset_*/"
-    echo "SLURM job outputs in: $GRID_DIR/slurm_jobs/"
 }}
 
-# Check initial status
-check_jobs
-
-# Wait for jobs to complete
+# Wait for jobs to complete: a no-op job that starts only after every array
+# task has ended. It queues for its own allocation, so it may finish some
+# time after the array does.
 echo "Waiting for jobs to complete..."
 echo "You can also check status manually with: squeue -u \\$USER"
 echo ""
 
-while true; do
-    running_jobs=0
-    for job_id in "${{JOB_IDS[@]}}"; do
-        if squeue -j $job_id &>/dev/null; then
-            running_jobs=$((running_jobs + 1))
-        fi
-    done
-    
-    if [ $running_jobs -eq 0 ]; then
-        echo "All jobs completed!"
-        check_jobs
-        collect_results
-        break
-    else
-        echo "Still running: $running_jobs jobs"
-        sleep 60  # Check every minute
-    fi
-done
+if ! sbatch --wait --quiet --dependency=afterany:$ARRAY_JOB_ID {wait_options} --wrap=true; then
+    echo "Wait job was rejected or failed; polling sacct instead"
+    wait_with_sacct
+fi
+
+echo "All jobs completed!"
+check_jobs
+collect_results
 """
     
-    with open(monitor_script, 'w') as f:
-        f.write(script_content)
+    # Result collection scans every task log once, in Python
+    with open(os.path.join(grid_output_dir, "collect_results.py"), 'w') as f:
+        f.write(COLLECT_RESULTS_SCRIPT)
     
-    os.chmod(monitor_script, 0o755)
+    _write_executable(monitor_script, script_content)
     return monitor_script
 
 
-def main():
-    """Main function for SLURM job submission."""
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Main function for SLURM job submission.
+    
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+        
+    Returns:
+        Process exit status
+    """
     parser = argparse.ArgumentParser(
         description="Submit SLURM jobs for parallel parameter grid simulation",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -477,10 +592,13 @@ Examples:
                        help="SLURM account")
     
     # Options
+    parser.add_argument("--balance-cost", action="store_true",
+                       help="Balance chunks by estimated run time (cohort size x total SNPs) "
+                            "instead of by number of combinations")
     parser.add_argument("--dry-run", action="store_true",
                        help="Create scripts but don't submit jobs")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Parse parameter lists
     def parse_int_list(value_str):
@@ -520,12 +638,12 @@ Examples:
         return 1
     
     # Display grid information
-    total_combinations = len(grid_config.get_parameter_combinations())
+    total_combinations = len(grid_config)
     print(f"Parameter Grid Configuration:")
-    print(f"  Cohort sizes: {grid_config.cohort_sizes}")
-    print(f"  Prevalences: {grid_config.prevalences}")
-    print(f"  Total SNPs: {grid_config.total_snps}")
-    print(f"  Causal SNPs: {grid_config.causal_snps}")
+    print(f"  Cohort sizes: {list(grid_config.cohort_sizes)}")
+    print(f"  Prevalences: {list(grid_config.prevalences)}")
+    print(f"  Total SNPs: {list(grid_config.total_snps)}")
+    print(f"  Causal SNPs: {list(grid_config.causal_snps)}")
     print(f"  Total combinations: {total_combinations}")
     print(f"  Output directory: {grid_config.grid_output_dir}")
     print()
@@ -552,14 +670,15 @@ Examples:
     
     # Submit jobs
     try:
-        job_ids = submit_slurm_jobs(grid_config, args.num_jobs, slurm_args, args.dry_run)
+        job_ids = submit_slurm_jobs(grid_config, args.num_jobs, slurm_args, args.dry_run,
+                                    args.balance_cost)
         
         if not args.dry_run and job_ids:
             print(f"\\nSuccessfully submitted {len(job_ids)} jobs!")
             print(f"Job IDs: {', '.join(job_ids)}")
             
             # Create monitoring script
-            monitor_script = create_monitor_script(args.grid_output_dir, job_ids)
+            monitor_script = create_monitor_script(args.grid_output_dir, job_ids, slurm_args)
             print(f"\\nMonitoring script created: {monitor_script}")
             print(f"To monitor jobs, run: {monitor_script}")
             print(f"To check job status manually: squeue -u $USER")
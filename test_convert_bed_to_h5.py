@@ -8,6 +8,7 @@ without requiring large datasets or all dependencies.
 
 import sys
 import os
+import tempfile
 from pathlib import Path
 
 # Add the current directory to the Python path
@@ -55,7 +56,7 @@ def test_chunk_calculation_logic():
     # Test the calculation formula manually
     def calculate_chunk_size(n_samples, n_variants, memory_usage_gb=2.0):
         """Replicate the chunk size calculation."""
-        bytes_per_sample = n_variants * 4  # float32
+        bytes_per_sample = n_variants  # int8
         target_memory_bytes = memory_usage_gb * 1024**3
         chunk_size = max(1, int(target_memory_bytes / bytes_per_sample))
         return min(chunk_size, n_samples)
@@ -69,7 +70,7 @@ def test_chunk_calculation_logic():
     
     for n_samples, n_variants, memory_gb in test_cases:
         chunk_size = calculate_chunk_size(n_samples, n_variants, memory_gb)
-        memory_per_chunk = (chunk_size * n_variants * 4) / (1024**3)
+        memory_per_chunk = (chunk_size * n_variants) / (1024**3)
         
         print(f"  {n_samples:,} samples × {n_variants:,} variants @ {memory_gb}GB:")
         print(f"    → chunk_size: {chunk_size:,} samples")
@@ -90,67 +91,72 @@ def test_file_discovery_logic():
     """Test the file discovery logic."""
     print("\nTesting file discovery logic...")
     
-    # Create test directory structure
-    test_dir = Path("test_discovery")
+    # Create test directory structure in the temp dir (usually tmpfs), removed on exit
     try:
-        test_dir.mkdir(exist_ok=True)
-        
-        # Create test files
-        test_files = [
-            "simulation1.bed",
-            "simulation1.bim", 
-            "simulation1.fam",
-            "simulation2.bed",
-            "simulation2.bim",
-            "simulation2.fam",
-            "temp-temporary.bed",  # Should be excluded
-            "temp-temporary.bim",
-            "temp-temporary.fam",
-            "incomplete.bed",      # Should be excluded (no .bim/.fam)
-        ]
-        
-        for file_name in test_files:
-            (test_dir / file_name).touch()
-        
-        # Test the logic manually (replicate find_bed_files logic)
-        bed_files = []
-        for bed_file in test_dir.rglob("*.bed"):
-            # Skip temporary files
-            if "temporary" in bed_file.name.lower():
-                print(f"  Skipping temporary file: {bed_file.name}")
-                continue
+        with tempfile.TemporaryDirectory(prefix="test_discovery_") as tmp:
+            test_dir = Path(tmp)
             
-            # Check for corresponding files
-            bim_file = bed_file.with_suffix('.bim')
-            fam_file = bed_file.with_suffix('.fam')
+            # Create test files
+            test_files = [
+                "simulation1.bed",
+                "simulation1.bim", 
+                "simulation1.fam",
+                "simulation2.bed",
+                "simulation2.bim",
+                "simulation2.fam",
+                "temp-temporary.bed",  # Should be excluded
+                "temp-temporary.bim",
+                "temp-temporary.fam",
+                "incomplete.bed",      # Should be excluded (no .bim/.fam)
+            ]
             
-            if not bim_file.exists():
-                print(f"  Missing .bim file for {bed_file.name}")
-                continue
+            for file_name in test_files:
+                (test_dir / file_name).touch()
             
-            if not fam_file.exists():
-                print(f"  Missing .fam file for {bed_file.name}")
-                continue
+            # Test the logic manually (replicate find_bed_files logic)
+            present = {}
+            with os.scandir(test_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    stem, _, ext = entry.name.rpartition('.')
+                    if stem and ext in ('bed', 'bim', 'fam'):
+                        present.setdefault(stem, set()).add(ext)
+            
+            bed_files = []
+            for stem in sorted(present):
+                extensions = present[stem]
+                if 'bed' not in extensions:
+                    continue
+            
+                # Skip temporary files
+                if "temporary" in stem.lower():
+                    print(f"  Skipping temporary file: {stem}.bed")
+                    continue
+            
+                # Check for corresponding files
+                if 'bim' not in extensions:
+                    print(f"  Missing .bim file for {stem}.bed")
+                    continue
+            
+                if 'fam' not in extensions:
+                    print(f"  Missing .fam file for {stem}.bed")
+                    continue
+            
+                bed_files.append(f"{stem}.bed")
+                print(f"  Found complete fileset: {stem}")
+            
+            # Verify results
+            expected_files = ["simulation1.bed", "simulation2.bed"]
+            found_files = [Path(f).name for f in bed_files]
+            
+            if set(found_files) == set(expected_files):
+                print("  ✓ File discovery logic is correct")
+                result = True
+            else:
+                print(f"  ✗ Expected {expected_files}, found {found_files}")
+                result = False
             
-            bed_files.append(bed_file.name)
-            print(f"  Found complete fileset: {bed_file.stem}")
-        
-        # Verify results
-        expected_files = ["simulation1.bed", "simulation2.bed"]
-        found_files = [Path(f).name for f in bed_files]
-        
-        if set(found_files) == set(expected_files):
-            print("  ✓ File discovery logic is correct")
-            result = True
-        else:
-            print(f"  ✗ Expected {expected_files}, found {found_files}")
-            result = False
-        
-        # Cleanup
-        for file_name in test_files:
-            (test_dir / file_name).unlink(missing_ok=True)
-        test_dir.rmdir()
-        
         return result
         
     except Exception as e:
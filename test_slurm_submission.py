@@ -6,28 +6,36 @@ This script creates and optionally submits a small parameter grid
 to test the SLURM submission functionality.
 """
 
+import io
 import os
 import sys
 import argparse
+import importlib
+import shutil
 import subprocess
+from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
 
 
-def test_chunked_submission(dry_run=True):
-    """Test chunked job submission with minimal parameters."""
-    print("Testing chunked SLURM submission...")
-    
+# Grid and resource arguments shared by all submission tests
+_COMMON_ARGS = (
+    "--cohort-sizes", "100,200",
+    "--prevalences", "0.01,0.05",
+    "--total-snps", "1000,2000",
+    "--causal-snps", "10,20",
+    "--memory", "1G",
+    "--partition", "cpu",
+)
+
+
+def chunked_submission_cmd(dry_run=True):
+    """Build the chunked job submission command with minimal parameters."""
     cmd = [
         "python", "submit_parameter_grid_slurm.py",
-        "--cohort-sizes", "100,200",
-        "--prevalences", "0.01,0.05",
-        "--total-snps", "1000,2000",
-        "--causal-snps", "10,20",
+        *_COMMON_ARGS,
         "--num-jobs", "2",
         "--time", "00:30:00",
-        "--memory", "1G",
         "--cpus", "1",
-        "--partition", "cpu",
         "--grid-output-dir", "test_chunked_grid",
         "--base-prefix", "test_dataset"
     ]
@@ -35,63 +43,34 @@ def test_chunked_submission(dry_run=True):
     if dry_run:
         cmd.append("--dry-run")
     
-    print("Command:", " ".join(cmd))
-    print()
-    
-    try:
-        result = subprocess.run(cmd, check=True)
-        return result.returncode == 0
-    except subprocess.CalledProcessError as e:
-        print(f"Error: {e}")
-        return False
+    return cmd
 
 
-def test_individual_submission(dry_run=True):
-    """Test individual job submission with minimal parameters."""
-    print("Testing individual SLURM submission...")
-    
+def individual_submission_cmd(dry_run=True):
+    """Build the individual job submission command with minimal parameters."""
     cmd = [
         "python", "submit_individual_slurm.py",
-        "--cohort-sizes", "100,200",
-        "--prevalences", "0.01,0.05",
-        "--total-snps", "1000,2000",
-        "--causal-snps", "10,20",
+        *_COMMON_ARGS,
         "--time", "00:15:00",
-        "--memory", "1G",
-        "--partition", "cpu",
         "--grid-output-dir", "test_individual_grid",
         "--base-prefix", "test_individual",
+        "--individual-jobs",
         "--max-jobs", "8"  # Limit to 8 jobs for testing
     ]
     
     if dry_run:
         cmd.append("--dry-run")
     
-    print("Command:", " ".join(cmd))
-    print()
-    
-    try:
-        result = subprocess.run(cmd, check=True)
-        return result.returncode == 0
-    except subprocess.CalledProcessError as e:
-        print(f"Error: {e}")
-        return False
+    return cmd
 
 
-def test_array_submission(dry_run=True):
-    """Test array job submission with minimal parameters."""
-    print("Testing array SLURM submission...")
-    
+def array_submission_cmd(dry_run=True):
+    """Build the array job submission command with minimal parameters."""
     cmd = [
         "python", "submit_individual_slurm.py",
-        "--cohort-sizes", "100,200",
-        "--prevalences", "0.01,0.05",
-        "--total-snps", "1000,2000",
-        "--causal-snps", "10,20",
+        *_COMMON_ARGS,
         "--use-array",
         "--time", "00:15:00",
-        "--memory", "1G",
-        "--partition", "cpu",
         "--grid-output-dir", "test_array_grid",
         "--base-prefix", "test_array"
     ]
@@ -99,15 +78,54 @@ def test_array_submission(dry_run=True):
     if dry_run:
         cmd.append("--dry-run")
     
+    return cmd
+
+
+def run_submission(cmd):
+    """
+    Run a submission command in-process by calling the script's main().
+    
+    Avoids starting a new interpreter (and re-importing gensim) per test.
+    Output is captured and returned like subprocess.run would.
+    """
+    module = importlib.import_module(Path(cmd[1]).stem)
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            returncode = module.main(cmd[2:])
+        except SystemExit as e:  # argparse errors
+            returncode = e.code
+    return subprocess.CompletedProcess(cmd, returncode, stdout.getvalue(), stderr.getvalue())
+
+
+def report_submission(cmd, result):
+    """Print a submission command and its output; return True on success."""
     print("Command:", " ".join(cmd))
     print()
-    
-    try:
-        result = subprocess.run(cmd, check=True)
-        return result.returncode == 0
-    except subprocess.CalledProcessError as e:
-        print(f"Error: {e}")
+    print(result.stdout, end="")
+    print(result.stderr, end="", file=sys.stderr)
+    if result.returncode != 0:
+        print(f"Error: Command '{cmd}' returned non-zero exit status {result.returncode}.")
         return False
+    return True
+
+
+def test_chunked_submission(dry_run=True):
+    """Test chunked job submission with minimal parameters."""
+    cmd = chunked_submission_cmd(dry_run)
+    return report_submission(cmd, run_submission(cmd))
+
+
+def test_individual_submission(dry_run=True):
+    """Test individual job submission with minimal parameters."""
+    cmd = individual_submission_cmd(dry_run)
+    return report_submission(cmd, run_submission(cmd))
+
+
+def test_array_submission(dry_run=True):
+    """Test array job submission with minimal parameters."""
+    cmd = array_submission_cmd(dry_run)
+    return report_submission(cmd, run_submission(cmd))
 
 
 def test_regular_parameter_grid():
@@ -151,10 +169,13 @@ def check_prerequisites():
         "gensim/__init__.py"
     ]
     
-    missing_files = []
-    for file_path in required_files:
-        if not os.path.exists(file_path):
-            missing_files.append(file_path)
+    # One directory listing answers the top-level files; only nested paths need a stat
+    with os.scandir(".") as entries:
+        present = {entry.name for entry in entries}
+    missing_files = [
+        file_path for file_path in required_files
+        if file_path not in present and ("/" not in file_path or not os.path.exists(file_path))
+    ]
     
     if missing_files:
         print(f"❌ Missing required files: {missing_files}")
@@ -162,14 +183,12 @@ def check_prerequisites():
     
     print("✓ All required files found")
     
-    # Check if SLURM is available
-    try:
-        subprocess.run(['squeue', '--version'], capture_output=True, check=True)
+    # Check if SLURM is available (a PATH lookup is enough, no need to run squeue)
+    slurm_available = shutil.which('squeue') is not None
+    if slurm_available:
         print("✓ SLURM detected")
-        slurm_available = True
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    else:
         print("⚠️  SLURM not detected (scripts will create files but won't submit)")
-        slurm_available = False
     
     # Check if Python modules can be imported
     try:
@@ -214,23 +233,21 @@ def main():
     
     print()
     
-    # Test chunked submission
-    print("1. Testing chunked job submission...")
-    success1 = test_chunked_submission(dry_run)
-    print("   Result:", "✓ Success" if success1 else "❌ Failed")
-    print()
-    
-    # Test individual submission
-    print("2. Testing individual job submission...")
-    success2 = test_individual_submission(dry_run)
-    print("   Result:", "✓ Success" if success2 else "❌ Failed")
-    print()
-    
-    # Test array submission
-    print("3. Testing array job submission...")
-    success3 = test_array_submission(dry_run)
-    print("   Result:", "✓ Success" if success3 else "❌ Failed")
-    print()
+    # The submission tests call the scripts' main() one after another in this
+    # interpreter, which already imported gensim during the prerequisites check
+    submission_tests = [
+        ("chunked", test_chunked_submission),
+        ("individual", test_individual_submission),
+        ("array", test_array_submission),
+    ]
+    successes = []
+    for i, (kind, test) in enumerate(submission_tests, 1):
+        print(f"{i}. Testing {kind} job submission...")
+        success = test(dry_run)
+        print("   Result:", "✓ Success" if success else "❌ Failed")
+        print()
+        successes.append(success)
+    success1, success2, success3 = successes
     
     # Test regular parameter grid if requested
     if args.test_regular: